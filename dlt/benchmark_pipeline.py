@@ -0,0 +1,185 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import dlt
+
+from dlttest1 import LOADER_FILE_FORMATS, apply_performance_options, pokeapi_source
+from mock_pokeapi import start_mock_pokeapi
+
+STAGES = ("extract", "normalize", "load")
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process and its finished children, in MB"""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # ru_maxrss is in KB on Linux and in bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(own / scale, 1), round(children / scale, 1)
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_once(base_url, work_dir, detail_concurrency, loader_file_format=None):
+    """Run extract, normalize and load separately and time each stage"""
+    pipeline = dlt.pipeline(
+        pipeline_name="pokeapi_benchmark",
+        pipelines_dir=os.path.join(work_dir, "pipelines"),
+        destination=dlt.destinations.duckdb(os.path.join(work_dir, "benchmark.duckdb")),
+        dataset_name="pokeapi_data",
+    )
+
+    timings = {}
+    started = time.perf_counter()
+    pipeline.extract(
+        pokeapi_source(base_url=base_url, detail_concurrency=detail_concurrency),
+        loader_file_format=loader_file_format,
+    )
+    timings["extract"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    normalize_info = pipeline.normalize()
+    timings["normalize"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    pipeline.load()
+    timings["load"] = time.perf_counter() - started
+
+    rows = sum(
+        count for table, count in normalize_info.row_counts.items() if not table.startswith("_dlt")
+    )
+    return timings, rows
+
+
+def run_benchmark(args):
+    apply_performance_options(workers=args.workers, buffer_max_items=args.buffer_max_items)
+
+    # The mock runs in its own process so serving it does not skew the timings
+    mock = start_mock_pokeapi(
+        pokemon_count=args.pokemon,
+        ability_count=args.abilities,
+        max_page_size=args.page_size,
+        latency=args.latency,
+        separate_process=True,
+    )
+    best = {stage: None for stage in STAGES}
+    try:
+        for _ in range(args.repeat):
+            with tempfile.TemporaryDirectory() as work_dir:
+                timings, rows = run_once(
+                    mock.base_url, work_dir, args.concurrency, args.loader_file_format
+                )
+            for stage in STAGES:
+                if best[stage] is None or timings[stage] < best[stage]:
+                    best[stage] = timings[stage]
+        requests_per_run = mock.request_count // args.repeat
+    finally:
+        mock.stop()
+
+    own_rss, children_rss = peak_rss_mb()
+    return {
+        "revision": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "pokemon": args.pokemon,
+            "abilities": args.abilities,
+            "page_size": args.page_size,
+            "latency": args.latency,
+            "concurrency": args.concurrency,
+            "workers": args.workers,
+            "buffer_max_items": args.buffer_max_items,
+            "loader_file_format": args.loader_file_format,
+            "repeat": args.repeat,
+        },
+        "rows": rows,
+        "requests": requests_per_run,
+        "stages": {
+            stage: {
+                "seconds": round(best[stage], 4),
+                "rows_per_second": round(rows / best[stage], 1) if best[stage] else None,
+            }
+            for stage in STAGES
+        },
+        "wall_seconds": round(sum(best.values()), 4),
+        "peak_rss_mb": own_rss,
+        "peak_rss_children_mb": children_rss,
+    }
+
+
+def find_regressions(results, baseline, threshold):
+    """List the stages that got slower than the baseline by more than `threshold`"""
+    regressions = []
+    for stage in STAGES:
+        before = baseline.get("stages", {}).get(stage, {}).get("seconds")
+        after = results["stages"][stage]["seconds"]
+        if before and after > before * (1 + threshold):
+            regressions.append(f"{stage}: {before:.3f}s -> {after:.3f}s (+{after / before - 1:.0%})")
+    return regressions
+
+
+def print_report(results):
+    print(f"{results['rows']} rows, {results['requests']} requests per run", file=sys.stderr)
+    for stage, numbers in results["stages"].items():
+        print(
+            f"  {stage:<10} {numbers['seconds']:>8.3f}s {numbers['rows_per_second']:>12.1f} rows/s",
+            file=sys.stderr,
+        )
+    print(
+        f"  {'total':<10} {results['wall_seconds']:>8.3f}s"
+        f"  peak RSS {results['peak_rss_mb']} MB (children {results['peak_rss_children_mb']} MB)",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the PokéAPI pipeline stages against a local mock API"
+    )
+    parser.add_argument("--pokemon", type=int, default=1300, help="Pokémon served by the mock")
+    parser.add_argument("--abilities", type=int, default=370, help="abilities served by the mock")
+    parser.add_argument("--page-size", type=int, default=1000, help="largest list page the mock returns")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every mock request")
+    parser.add_argument("--concurrency", type=int, default=16, help="detail requests in flight")
+    parser.add_argument("--workers", type=int, help="normalize worker processes")
+    parser.add_argument("--buffer-max-items", type=int, help="items buffered per table during extract")
+    parser.add_argument("--loader-file-format", choices=LOADER_FILE_FORMATS, help="load package file format")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage, the fastest is kept")
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2,
+        help="fail when a stage is slower than the baseline by more than this fraction",
+    )
+    args = parser.parse_args()
+
+    results = run_benchmark(args)
+    print_report(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = find_regressions(results, json.load(f), args.threshold)
+        if regressions:
+            print("Regressions past the threshold:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            sys.exit(1)
@@ -1,42 +1,202 @@
+import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import dlt
-from dlt.sources.rest_api import rest_api_source
-
-# Define the REST API source for PokéAPI
-source = rest_api_source({
-    "client": {
-        "base_url": "https://pokeapi.co/api/v2/",
-        "paginator": {
-            "type": "json_link",
-            "next_url_path": "next",  # PokéAPI uses 'next' for pagination
-        },
-    },
-    "resources": [
-        {
-            "name": "pokemon",
-            "endpoint": "pokemon"
-        },
-        {
-            "name": "ability",
-            "endpoint": "ability"
-        },
+from dlt.sources.helpers.requests import Client
+from dlt.sources.rest_api import rest_api_resources
+
+from http_cache import cached_session
+from pokemon_aggregates import materialize_aggregates
+from pokemon_normalize import POKEMON_COLUMN_HINTS, flatten_pokemon, pokemon_type_bits
+
+POKEAPI_BASE_URL = "https://pokeapi.co/api/v2/"
+
+# Number of Pokémon detail requests kept in flight at once
+DETAIL_CONCURRENCY = 16
+
+# Loader file formats the duckdb destination accepts
+LOADER_FILE_FORMATS = ("jsonl", "parquet", "insert_values")
+
+
+def add_id_from_url(record):
+    """Add the numeric PokéAPI id parsed from the record's detail url"""
+    record["id"] = int(record["url"].rstrip("/").rsplit("/", 1)[-1])
+    return record
+
+
+# Shared resource settings: list records are keyed by their PokéAPI id and
+# merged, and the highest id seen so far is kept in the pipeline state so a
+# re-run only writes records that were added upstream since the last load.
+incremental_resource = {
+    "primary_key": "id",
+    "write_disposition": "merge",
+    "processing_steps": [
+        {"map": add_id_from_url},
     ],
-})
+}
+
+
+@dlt.transformer(name="pokemon", primary_key="id", write_disposition="merge")
+def pokemon_details(pokemon_list, concurrency=DETAIL_CONCURRENCY, session=None):
+    """
+    Fetch the full record (stats, types, base experience, ...) for every
+    Pokémon in a page of the list endpoint
+
+    Args:
+        pokemon_list: A page of `{name, url, id}` records from the list endpoint
+        concurrency: Maximum number of detail requests in flight at once
+        session: Optional `requests.Session` to fetch with, a retrying dlt
+            client with a pool sized to `concurrency` is used by default
+    """
+    if session is None:
+        session = Client(max_connections=concurrency)
+
+    def fetch(url):
+        response = session.get(url)
+        response.raise_for_status()
+        return response.json()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # map() keeps the page order while up to `concurrency` requests run
+        yield list(executor.map(fetch, [record["url"] for record in pokemon_list]))
+
+
+@dlt.source(name="pokeapi")
+def pokeapi_source(
+    base_url=POKEAPI_BASE_URL,
+    detail_concurrency=DETAIL_CONCURRENCY,
+    cache_dir=None,
+    cache_ttl=3600,
+    cache_max_bytes=256 * 1024 * 1024,
+):
+    """
+    PokéAPI source: the `pokemon` table holds flattened detail records
+    fetched concurrently for every entry of the (unselected) `pokemon_list`
+    endpoint, `pokemon_type_bits` maps type names to their `type_mask` bit
+
+    Args:
+        base_url: PokéAPI root, may point at a local stand-in server
+        detail_concurrency: Maximum number of detail requests in flight
+        cache_dir: When set, responses are cached on disk in this directory
+            and revalidated with ETag / Last-Modified once `cache_ttl`
+            seconds have passed
+        cache_ttl: Seconds a cached response is used without revalidation
+        cache_max_bytes: Size the response cache is trimmed to
+    """
+    session = None
+    if cache_dir:
+        session = cached_session(
+            cache_dir, ttl=cache_ttl, max_bytes=cache_max_bytes, pool_size=detail_concurrency
+        )
+
+    pokemon_list, ability = rest_api_resources({
+        "client": {
+            "base_url": base_url,
+            "paginator": {
+                "type": "json_link",
+                "next_url_path": "next",  # PokéAPI uses 'next' for pagination
+            },
+            "session": session,
+        },
+        "resource_defaults": incremental_resource,
+        "resources": [
+            {
+                "name": "pokemon_list",
+                # Only feeds the detail transformer, not loaded on its own
+                "selected": False,
+                "endpoint": {
+                    "path": "pokemon",
+                    # Large pages keep the list walk to a couple of requests
+                    "params": {"limit": 1000},
+                    "incremental": {"cursor_path": "id", "initial_value": 0},
+                },
+            },
+            {
+                "name": "ability",
+                "endpoint": {
+                    "path": "ability",
+                    "params": {"limit": 1000},
+                    "incremental": {"cursor_path": "id", "initial_value": 0},
+                },
+            },
+        ],
+    })
+
+    # Stats and types are flattened into typed columns before they are loaded
+    pokemon = pokemon_list | pokemon_details(concurrency=detail_concurrency, session=session)
+    pokemon.add_map(flatten_pokemon).apply_hints(columns=POKEMON_COLUMN_HINTS)
+
+    return pokemon_list, pokemon, ability, pokemon_type_bits
+
+
+def apply_performance_options(workers=None, buffer_max_items=None):
+    """
+    Override dlt's normalize and extract settings for this process
+
+    Options left as None keep the value from `.dlt/config.toml` or the
+    environment.
+
+    Args:
+        workers: Number of normalize worker processes
+        buffer_max_items: Items buffered in memory per table before the
+            extract step writes them to a file
+    """
+    if workers is not None:
+        os.environ["NORMALIZE__WORKERS"] = str(workers)
+    if buffer_max_items is not None:
+        os.environ["EXTRACT__DATA_WRITER__BUFFER_MAX_ITEMS"] = str(buffer_max_items)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load PokéAPI data into DuckDB with dlt")
+    parser.add_argument("--workers", type=int, help="normalize worker processes ([normalize] workers)")
+    parser.add_argument(
+        "--buffer-max-items", type=int,
+        help="items buffered per table during extract ([extract.data_writer] buffer_max_items)",
+    )
+    parser.add_argument(
+        "--loader-file-format", choices=LOADER_FILE_FORMATS,
+        help="file format of the load package ([pokeapi_pipeline] loader_file_format)",
+    )
+    parser.add_argument(
+        "--detail-concurrency", type=int,
+        help="detail requests in flight ([sources.pokeapi] detail_concurrency)",
+    )
+    parser.add_argument("--cache-dir", help="cache API responses on disk in this directory")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    apply_performance_options(workers=args.workers, buffer_max_items=args.buffer_max_items)
+    loader_file_format = args.loader_file_format or dlt.config.get("pokeapi_pipeline.loader_file_format")
+
+    # Source arguments that are not passed resolve from [sources.pokeapi] or their defaults
+    source_args = {}
+    if args.detail_concurrency is not None:
+        source_args["detail_concurrency"] = args.detail_concurrency
+    if args.cache_dir:
+        source_args["cache_dir"] = args.cache_dir
+
+    # Define the pipeline
+    pipeline = dlt.pipeline(
+        pipeline_name="pokeapi_example",
+        destination="duckdb",
+        dataset_name="pokeapi_data",
+    )
 
-# Define the pipeline
-pipeline = dlt.pipeline(
-    pipeline_name="pokeapi_example",
-    destination="duckdb",
-    dataset_name="pokeapi_data",
-)
+    # Run the pipeline
+    load_info = pipeline.run(pokeapi_source(**source_args), loader_file_format=loader_file_format)
 
-# Run the pipeline
-load_info = pipeline.run(source)
+    # Print load info
+    print(load_info)
 
-# Print load info
-print(load_info)
+    # Rebuild the summary tables read by the Streamlit dashboard
+    print("Materialized:", ", ".join(materialize_aggregates(pipeline)))
 
-# Print the first few rows of the Pokémon table
-print(pipeline.dataset().pokemon.df().head())
+    # Print the first few rows of the Pokémon table
+    print(pipeline.dataset().pokemon.df().head())
 
-# Print the first few rows of the Ability table
-print(pipeline.dataset().ability.df().head())
\ No newline at end of file
+    # Print the first few rows of the Ability table
+    print(pipeline.dataset().ability.df().head())
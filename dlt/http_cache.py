@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3.util.retry import Retry
+
+from dlt.sources.helpers.requests import Session
+
+# Response headers kept with a cached body
+STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+class ResponseCache:
+    """
+    On-disk store of GET response bodies keyed by URL
+
+    Every entry is a `<key>.body` file with the raw payload and a `<key>.json`
+    file with the url, the validators (ETag / Last-Modified) and the time it
+    was last confirmed fresh. When the bodies grow past `max_bytes` the least
+    recently used entries are evicted.
+    """
+
+    def __init__(self, cache_dir, ttl=3600, max_bytes=256 * 1024 * 1024):
+        """
+        Args:
+            cache_dir: Directory the entries are stored in, created if missing
+            ttl: Seconds an entry is served without asking the server again
+            max_bytes: Upper bound for the total size of the cached bodies
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # key -> [body size, last access time], rebuilt from disk on start
+        self._index = {}
+        for file_name in os.listdir(cache_dir):
+            if file_name.endswith(".body"):
+                stat = os.stat(os.path.join(cache_dir, file_name))
+                self._index[file_name[:-5]] = [stat.st_size, stat.st_mtime]
+        self._total_bytes = sum(size for size, _ in self._index.values())
+
+    @staticmethod
+    def key(url):
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _path(self, key, suffix):
+        return os.path.join(self.cache_dir, key + suffix)
+
+    def get(self, url):
+        """Return `(meta, body)` for a cached url, or None"""
+        key = self.key(url)
+        with self._lock:
+            if key not in self._index:
+                return None
+            try:
+                with open(self._path(key, ".json"), encoding="utf-8") as f:
+                    meta = json.load(f)
+                with open(self._path(key, ".body"), "rb") as f:
+                    body = f.read()
+            except (OSError, ValueError):
+                self._remove(key)
+                return None
+            now = time.time()
+            self._index[key][1] = now
+            os.utime(self._path(key, ".body"), (now, now))
+        return meta, body
+
+    def is_fresh(self, meta):
+        return time.time() - meta["stored_at"] < self.ttl
+
+    def put(self, url, headers, body):
+        """Store a response body and its validators, then evict if over size"""
+        key = self.key(url)
+        meta = {
+            "url": url,
+            "headers": {name: headers[name] for name in STORED_HEADERS if name in headers},
+            "stored_at": time.time(),
+        }
+        with self._lock:
+            self._write(self._path(key, ".body"), body)
+            self._write(self._path(key, ".json"), json.dumps(meta).encode("utf-8"))
+            previous_size = self._index.get(key, [0])[0]
+            self._index[key] = [len(body), time.time()]
+            self._total_bytes += len(body) - previous_size
+            self._evict()
+
+    def touch(self, url, headers):
+        """Mark an entry as fresh again after the server answered 304"""
+        cached = self.get(url)
+        if cached is None:
+            return
+        meta, body = cached
+        # A 304 may carry updated validators
+        merged = CaseInsensitiveDict(meta["headers"])
+        merged.update({name: headers[name] for name in STORED_HEADERS if name in headers})
+        self.put(url, merged, body)
+
+    def _write(self, path, data):
+        # Write then rename so readers never see a partial file
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _remove(self, key):
+        size, _ = self._index.pop(key, [0, 0])
+        self._total_bytes -= size
+        for suffix in (".body", ".json"):
+            try:
+                os.remove(self._path(key, suffix))
+            except FileNotFoundError:
+                pass
+
+    def _evict(self):
+        if self._total_bytes <= self.max_bytes:
+            return
+        for key, _ in sorted(self._index.items(), key=lambda item: item[1][1]):
+            self._remove(key)
+            if self._total_bytes <= self.max_bytes:
+                break
+
+
+class CachingAdapter(HTTPAdapter):
+    """
+    Transport adapter that answers GET requests from a `ResponseCache`
+
+    Fresh entries are returned without touching the network. Stale entries
+    are revalidated with `If-None-Match` / `If-Modified-Since` and a `304`
+    reply is served from the cached body. Cached responses carry
+    `from_cache = True`.
+    """
+
+    def __init__(self, cache, **kwargs):
+        self.cache = cache
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if request.method != "GET":
+            return super().send(request, **kwargs)
+
+        cached = self.cache.get(request.url)
+        if cached is not None:
+            meta, body = cached
+            if self.cache.is_fresh(meta):
+                return self._cached_response(request, meta, body)
+            validators = meta["headers"]
+            if "ETag" in validators:
+                request.headers["If-None-Match"] = validators["ETag"]
+            if "Last-Modified" in validators:
+                request.headers["If-Modified-Since"] = validators["Last-Modified"]
+
+        response = super().send(request, **kwargs)
+
+        if response.status_code == 304 and cached is not None:
+            self.cache.touch(request.url, response.headers)
+            response.close()
+            return self._cached_response(request, meta, body)
+        if response.status_code == 200:
+            self.cache.put(request.url, response.headers, response.content)
+        return response
+
+    def _cached_response(self, request, meta, body):
+        response = Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.headers = CaseInsensitiveDict(meta["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response._content = body
+        response.from_cache = True
+        response.connection = self
+        return response
+
+
+def cached_session(cache_dir, ttl=3600, max_bytes=256 * 1024 * 1024, pool_size=10):
+    """
+    Create a dlt `Session` that serves GET requests through an on-disk cache
+
+    The session does not raise on error status codes, as expected by the
+    `rest_api` client; 429 and 5xx replies are retried by the adapter.
+    """
+    session = Session(raise_for_status=False)
+    adapter = CachingAdapter(
+        ResponseCache(cache_dir, ttl=ttl, max_bytes=max_bytes),
+        pool_maxsize=pool_size,
+        max_retries=Retry(
+            total=5,
+            backoff_factor=1,
+            status_forcelist=(429, 500, 502, 503, 504),
+            respect_retry_after_header=True,
+        ),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
@@ -0,0 +1,233 @@
+import argparse
+import hashlib
+import json
+import multiprocessing
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from pokemon_normalize import POKEMON_TYPES
+
+STAT_NAMES = ["hp", "attack", "defense", "special-attack", "special-defense", "speed"]
+
+
+def pokemon_record(base_url, pokemon_id):
+    """Build a deterministic detail record shaped like PokéAPI's /pokemon/{id}"""
+    type_names = [POKEMON_TYPES[pokemon_id % 18]]
+    if pokemon_id % 2:
+        type_names.append(POKEMON_TYPES[(pokemon_id * 7) % 18])
+    return {
+        "id": pokemon_id,
+        "name": f"pokemon-{pokemon_id}",
+        "base_experience": 50 + pokemon_id % 250,
+        "height": 1 + pokemon_id % 20,
+        "weight": 10 + pokemon_id % 900,
+        "order": pokemon_id,
+        "is_default": True,
+        "stats": [
+            {
+                "base_stat": 20 + (pokemon_id * (position + 3)) % 130,
+                "effort": position % 3,
+                "stat": {"name": name, "url": f"{base_url}stat/{position + 1}/"},
+            }
+            for position, name in enumerate(STAT_NAMES)
+        ],
+        "types": [
+            {"slot": slot, "type": {"name": name, "url": f"{base_url}type/{name}/"}}
+            for slot, name in enumerate(type_names, 1)
+        ],
+        "abilities": [
+            {
+                "ability": {"name": f"ability-{(pokemon_id + slot) % 300 + 1}", "url": ""},
+                "is_hidden": slot == 3,
+                "slot": slot,
+            }
+            for slot in range(1, 2 + pokemon_id % 3)
+        ],
+        # Large nested payload that the pipeline drops during normalization
+        "moves": [
+            {
+                "move": {"name": f"move-{(pokemon_id * move) % 900}", "url": ""},
+                "version_group_details": [{"level_learned_at": move, "version_group": {"name": "red-blue"}}],
+            }
+            for move in range(1, 41)
+        ],
+    }
+
+
+class MockPokeAPIHandler(BaseHTTPRequestHandler):
+    """Serves `/api/v2/{pokemon,ability}` lists and `/api/v2/pokemon/{id}` details"""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes, Nagle would delay keep-alive replies
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        with server.request_count.get_lock():
+            server.request_count.value += 1
+        if server.latency:
+            time.sleep(server.latency)
+
+        url = urlparse(self.path)
+        parts = url.path.strip("/").split("/")
+        base_url = f"http://{self.headers['Host']}/api/v2/"
+        if parts[:2] != ["api", "v2"] or len(parts) not in (3, 4):
+            return self._send(404, {"detail": "Not found."})
+
+        resource = parts[2]
+        counts = {"pokemon": server.pokemon_count, "ability": server.ability_count}
+        if resource not in counts:
+            return self._send(404, {"detail": "Not found."})
+
+        if len(parts) == 3:
+            query = parse_qs(url.query)
+            offset = int(query.get("offset", [0])[0])
+            limit = min(int(query.get("limit", [20])[0]), server.max_page_size)
+            last_id = min(offset + limit, counts[resource])
+            body = {
+                "count": counts[resource],
+                "next": (
+                    f"{base_url}{resource}?offset={offset + limit}&limit={limit}"
+                    if last_id < counts[resource] else None
+                ),
+                "previous": None,
+                "results": [
+                    {"name": f"{resource}-{i}", "url": f"{base_url}{resource}/{i}/"}
+                    for i in range(offset + 1, last_id + 1)
+                ],
+            }
+            return self._send(200, body)
+
+        item_id = int(parts[3])
+        if resource != "pokemon" or not 1 <= item_id <= counts[resource]:
+            return self._send(404, {"detail": "Not found."})
+        return self._send(200, pokemon_record(base_url, item_id))
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode("utf-8")
+        etag = '"' + hashlib.md5(payload).hexdigest() + '"'
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        if status == 200:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class MockPokeAPI:
+    """Handle on a running mock server"""
+
+    def __init__(self, base_url, request_count, stop):
+        self.base_url = base_url
+        self._request_count = request_count
+        self._stop = stop
+
+    @property
+    def request_count(self):
+        """Number of requests that reached the server so far"""
+        return self._request_count.value
+
+    def stop(self):
+        self._stop()
+
+
+def _make_server(request_count, pokemon_count, ability_count, max_page_size, latency, port):
+    server = ThreadingHTTPServer(("127.0.0.1", port), MockPokeAPIHandler)
+    server.daemon_threads = True
+    server.pokemon_count = pokemon_count
+    server.ability_count = ability_count
+    server.max_page_size = max_page_size
+    server.latency = latency
+    server.request_count = request_count
+    return server
+
+
+def _serve_in_process(port_queue, request_count, options):
+    server = _make_server(request_count, **options)
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+def start_mock_pokeapi(
+    pokemon_count=1300,
+    ability_count=370,
+    max_page_size=1000,
+    latency=0.0,
+    port=0,
+    separate_process=False,
+):
+    """
+    Start a local stand-in for PokéAPI
+
+    Args:
+        pokemon_count: Number of Pokémon served by the list and detail endpoints
+        ability_count: Number of abilities served by the list endpoint
+        max_page_size: Largest page a list request may get, whatever its `limit`
+        latency: Seconds every request is delayed by
+        port: Port to listen on, a free one is picked by default
+        separate_process: Serve from a child process instead of a thread, so
+            the mock does not compete with the caller for the GIL
+
+    Returns:
+        MockPokeAPI: Handle with the `base_url` to pass as
+        `pokeapi_source(base_url=...)`, the `request_count` and `stop()`
+    """
+    request_count = multiprocessing.Value("i", 0)
+    options = {
+        "pokemon_count": pokemon_count,
+        "ability_count": ability_count,
+        "max_page_size": max_page_size,
+        "latency": latency,
+        "port": port,
+    }
+
+    if separate_process:
+        port_queue = multiprocessing.Queue()
+        process = multiprocessing.Process(
+            target=_serve_in_process, args=(port_queue, request_count, options), daemon=True
+        )
+        process.start()
+        port = port_queue.get(timeout=30)
+
+        def stop():
+            process.terminate()
+            process.join()
+    else:
+        server = _make_server(request_count, **options)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        port = server.server_address[1]
+
+        def stop():
+            server.shutdown()
+            server.server_close()
+
+    return MockPokeAPI(f"http://127.0.0.1:{port}/api/v2/", request_count, stop)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local stand-in for PokéAPI")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--pokemon", type=int, default=1300, help="number of Pokémon served")
+    parser.add_argument("--abilities", type=int, default=370, help="number of abilities served")
+    parser.add_argument("--max-page-size", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    args = parser.parse_args()
+
+    mock = start_mock_pokeapi(args.pokemon, args.abilities, args.max_page_size, args.latency, args.port)
+    print(f"Mock PokéAPI serving at {mock.base_url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        mock.stop()
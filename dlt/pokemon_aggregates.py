@@ -0,0 +1,62 @@
+from pokemon_normalize import STAT_COLUMNS
+
+# Small summary tables rebuilt after every load, keyed by table name. Each
+# query reads from the loaded tables of the same dataset; `{pokemon}` style
+# placeholders are replaced with qualified table names and `{stat_columns}`
+# with the flattened stat columns.
+AGGREGATES = {
+    "pokemon_summary": """
+        SELECT
+            (SELECT count(*) FROM {pokemon}) AS pokemon_count,
+            (SELECT count(*) FROM {ability}) AS ability_count,
+            (SELECT avg(base_experience) FROM {pokemon}) AS avg_base_experience
+    """,
+    "pokemon_type_counts": """
+        SELECT t.name AS type_name, count(*) AS pokemon_count
+        FROM {pokemon} AS p
+        JOIN {pokemon_type_bits} AS t ON (p.type_mask & t.bit) <> 0
+        GROUP BY t.name
+        ORDER BY pokemon_count DESC, type_name
+    """,
+    "pokemon_stat_summary": """
+        SELECT
+            stat_name,
+            min(base_stat) AS min_value,
+            max(base_stat) AS max_value,
+            avg(base_stat) AS avg_value,
+            median(base_stat) AS median_value
+        FROM (
+            UNPIVOT (SELECT {stat_columns} FROM {pokemon})
+            ON {stat_columns}
+            INTO NAME stat_name VALUE base_stat
+        )
+        GROUP BY stat_name
+        ORDER BY stat_name
+    """,
+    "ability_counts": """
+        SELECT ability_name, count(*) AS pokemon_count
+        FROM {pokemon__abilities}
+        GROUP BY ability_name
+        ORDER BY pokemon_count DESC, ability_name
+    """,
+}
+
+SOURCE_TABLES = ("pokemon", "ability", "pokemon_type_bits", "pokemon__abilities")
+
+
+def materialize_aggregates(pipeline):
+    """
+    Rebuild the aggregate tables read by the Streamlit statistics tab
+
+    Runs as a post-load step so the dashboard never has to scan the
+    per-Pokémon rows on a rerun.
+    """
+    with pipeline.sql_client() as client:
+        tables = {name: client.make_qualified_table_name(name) for name in SOURCE_TABLES}
+        tables["stat_columns"] = ", ".join(client.escape_column_name(c) for c in STAT_COLUMNS)
+        for name, query in AGGREGATES.items():
+            client.execute_sql(
+                f"CREATE OR REPLACE TABLE {client.make_qualified_table_name(name)} AS "
+                + query.format(**tables)
+            )
+    return list(AGGREGATES)
@@ -0,0 +1,68 @@
+import dlt
+
+# Base stats in PokéAPI order, stored as one integer column each
+STAT_COLUMNS = ["hp", "attack", "defense", "special_attack", "special_defense", "speed"]
+
+# Every Pokémon type owns one bit of `type_mask`, the position never changes
+POKEMON_TYPES = [
+    "normal", "fighting", "flying", "poison", "ground", "rock", "bug", "ghost",
+    "steel", "fire", "water", "grass", "electric", "psychic", "ice", "dragon",
+    "dark", "fairy", "stellar", "unknown", "shadow",
+]
+TYPE_BITS = {name: 1 << position for position, name in enumerate(POKEMON_TYPES)}
+
+# Scalar fields of the detail record that are loaded as they are
+POKEMON_FIELDS = ["id", "name", "base_experience", "height", "weight", "order", "is_default"]
+
+POKEMON_COLUMN_HINTS = {
+    **{name: {"data_type": "bigint", "nullable": True} for name in STAT_COLUMNS},
+    "type_mask": {"data_type": "bigint", "nullable": False},
+    "primary_type": {"data_type": "text", "nullable": True},
+    "secondary_type": {"data_type": "text", "nullable": True},
+}
+
+
+def type_mask(type_names):
+    """Combine type names into a `type_mask` value"""
+    mask = 0
+    for name in type_names:
+        if name not in TYPE_BITS:
+            raise ValueError(f"Unknown Pokémon type {name!r}, add it to POKEMON_TYPES")
+        mask |= TYPE_BITS[name]
+    return mask
+
+
+def flatten_pokemon(record):
+    """
+    Turn a PokéAPI detail record into a flat row
+
+    `stats` becomes one integer column per stat and `types` becomes the
+    `type_mask` bitmask plus `primary_type` / `secondary_type`. Only the
+    scalar fields and `abilities` (loaded as a child table) are kept, the
+    large nested lists such as `moves` are dropped.
+    """
+    row = {field: record.get(field) for field in POKEMON_FIELDS}
+
+    for stat in record.get("stats", []):
+        row[stat["stat"]["name"].replace("-", "_")] = stat["base_stat"]
+
+    type_names = [t["type"]["name"] for t in sorted(record.get("types", []), key=lambda t: t["slot"])]
+    row["type_mask"] = type_mask(type_names)
+    row["primary_type"] = type_names[0] if type_names else None
+    row["secondary_type"] = type_names[1] if len(type_names) > 1 else None
+
+    row["abilities"] = [
+        {
+            "ability_name": a["ability"]["name"],
+            "is_hidden": a.get("is_hidden"),
+            "slot": a.get("slot"),
+        }
+        for a in record.get("abilities", [])
+    ]
+    return row
+
+
+@dlt.resource(name="pokemon_type_bits", write_disposition="replace")
+def pokemon_type_bits():
+    """Lookup table from type name to its `type_mask` bit"""
+    yield [{"name": name, "bit": bit} for name, bit in TYPE_BITS.items()]
@@ -0,0 +1,108 @@
+# Maximum number of rows a single page may request
+MAX_PAGE_SIZE = 500
+
+
+def _table_columns(client, table):
+    query = (
+        "SELECT column_name FROM information_schema.columns"
+        " WHERE table_schema = %s AND table_name = %s ORDER BY ordinal_position"
+    )
+    with client.execute_query(query, client.dataset_name, table) as cursor:
+        return [row[0] for row in cursor.fetchall()]
+
+
+def table_columns(pipeline, table, include_dlt=False):
+    """List the column names of a loaded table"""
+    with pipeline.sql_client() as client:
+        columns = _table_columns(client, table)
+    return [name for name in columns if include_dlt or not name.startswith("_dlt_")]
+
+
+def _select_list(client, table, columns):
+    available = _table_columns(client, table)
+    if not columns:
+        columns = [name for name in available if not name.startswith("_dlt_")]
+    unknown = [name for name in columns if name not in available]
+    if unknown:
+        raise ValueError(f"Unknown column(s) for table {table}: {', '.join(unknown)}")
+    return ", ".join(client.escape_column_name(name) for name in columns)
+
+
+def _name_filter(search):
+    # Name matching is case-insensitive, the value is always bound as a parameter
+    if not search:
+        return "", []
+    return " WHERE contains(lower(name), %s)", [search.lower()]
+
+
+def search_table(pipeline, table, search="", columns=None, limit=50, offset=0):
+    """
+    Fetch one page of rows whose name contains `search`
+
+    Args:
+        pipeline: The dlt pipeline that loaded the dataset
+        table: Table to read, e.g. `pokemon` or `ability`
+        search: Case-insensitive substring matched against the `name` column
+        columns: Columns to return, all data columns when empty
+        limit: Page size, capped at `MAX_PAGE_SIZE`
+        offset: Number of matching rows to skip
+
+    Returns:
+        DataFrame: The requested page ordered by `id`
+    """
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    offset = max(0, int(offset))
+    with pipeline.sql_client() as client:
+        select_list = _select_list(client, table, columns)
+        where, params = _name_filter(search)
+        query = (
+            f"SELECT {select_list} FROM {client.make_qualified_table_name(table)}"
+            f"{where} ORDER BY id LIMIT %s OFFSET %s"
+        )
+        with client.execute_query(query, *params, limit, offset) as cursor:
+            return cursor.df()
+
+
+def read_columns(pipeline, table, columns, as_arrow=False):
+    """
+    Read whole columns of a table, ordered by `id`
+
+    With `as_arrow` the result is a `pyarrow.Table` taken straight from
+    DuckDB, without building a pandas frame.
+    """
+    with pipeline.sql_client() as client:
+        select_list = _select_list(client, table, columns)
+        query = f"SELECT {select_list} FROM {client.make_qualified_table_name(table)} ORDER BY id"
+        with client.execute_query(query) as cursor:
+            return cursor.arrow() if as_arrow else cursor.df()
+
+
+def latest_load_id(pipeline):
+    """Return the id of the most recent completed load, or None"""
+    with pipeline.sql_client() as client:
+        query = (
+            f"SELECT max(load_id) FROM {client.make_qualified_table_name('_dlt_loads')}"
+            " WHERE status = 0"
+        )
+        with client.execute_query(query) as cursor:
+            return cursor.fetchone()[0]
+
+
+def count_rows(pipeline, table, search=""):
+    """Count the rows whose name contains `search`"""
+    with pipeline.sql_client() as client:
+        where, params = _name_filter(search)
+        query = f"SELECT count(*) FROM {client.make_qualified_table_name(table)}{where}"
+        with client.execute_query(query, *params) as cursor:
+            return cursor.fetchone()[0]
+
+
+def read_table(pipeline, table, limit=None):
+    """Read a small table, such as a precomputed aggregate, in full"""
+    with pipeline.sql_client() as client:
+        query = f"SELECT * FROM {client.make_qualified_table_name(table)}"
+        if limit is None:
+            with client.execute_query(query) as cursor:
+                return cursor.df()
+        with client.execute_query(query + " LIMIT %s", int(limit)) as cursor:
+            return cursor.df()
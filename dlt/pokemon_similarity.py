@@ -0,0 +1,71 @@
+import numpy as np
+import pyarrow.compute as pc
+
+from pokemon_normalize import STAT_COLUMNS
+
+METRICS = ("euclidean", "cosine")
+
+
+class StatsIndex:
+    """
+    In-memory matrix of the six base stats answering "most similar Pokémon"
+    queries with one vectorized distance computation per lookup
+    """
+
+    def __init__(self, names, stats):
+        """
+        Args:
+            names: Pokémon names, one per matrix row
+            stats: Array of shape (len(names), len(STAT_COLUMNS))
+        """
+        self.names = list(names)
+        self.stats = np.asarray(stats, dtype=np.float32)
+        self._rows = {name: row for row, name in enumerate(self.names)}
+        # Unit-length rows turn cosine similarity into a single dot product
+        norms = np.linalg.norm(self.stats, axis=1, keepdims=True)
+        self._unit = self.stats / np.where(norms == 0, 1, norms)
+
+    @classmethod
+    def from_arrow(cls, table):
+        """Build the index from an Arrow table with `name` and the stat columns"""
+        stats = np.column_stack(
+            [pc.fill_null(table[column], 0).to_numpy() for column in STAT_COLUMNS]
+        )
+        return cls(table["name"].to_pylist(), stats)
+
+    def __len__(self):
+        return len(self.names)
+
+    def stats_for(self, name):
+        """Base stats of `name` in `STAT_COLUMNS` order, looked up in constant time"""
+        return self.stats[self._rows[name]]
+
+    def most_similar(self, name, k=5, metric="euclidean"):
+        """
+        Find the `k` Pokémon whose base stats are closest to `name`'s
+
+        Args:
+            name: Pokémon to compare against
+            k: Number of results, the Pokémon itself is never included
+            metric: `euclidean` compares absolute stat values, `cosine`
+                compares the stat distribution regardless of total strength
+
+        Returns:
+            list: `(name, distance)` tuples, closest first
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric {metric!r}, expected one of {', '.join(METRICS)}")
+        row = self._rows[name]
+        if metric == "euclidean":
+            distances = np.linalg.norm(self.stats - self.stats[row], axis=1)
+        else:
+            distances = 1 - self._unit @ self._unit[row]
+        distances[row] = np.inf
+
+        k = min(k, len(self.names) - 1)
+        if k <= 0:
+            return []
+        # argpartition finds the k smallest without sorting the whole array
+        nearest = np.argpartition(distances, k - 1)[:k]
+        nearest = nearest[np.argsort(distances[nearest])]
+        return [(self.names[i], float(distances[i])) for i in nearest]
@@ -1,8 +1,13 @@
 import streamlit as st
 import dlt
-import pandas as pd
 import plotly.express as px
+import pandas as pd
 import plotly.graph_objects as go
+import pyarrow.compute as pc
+
+from pokemon_normalize import STAT_COLUMNS, TYPE_BITS
+from pokemon_queries import count_rows, latest_load_id, read_columns, read_table, search_table, table_columns
+from pokemon_similarity import METRICS, StatsIndex
 
 # Set up the page configuration
 st.set_page_config(page_title="Pokemon Data Explorer", layout="wide")
@@ -12,61 +17,92 @@ st.title("Pokemon Data Explorer")
 st.write("Explore Pokemon data fetched from PokeAPI using DLT pipeline")
 
 # Initialize DLT pipeline
-@st.cache_data
-def load_pokemon_data():
-    pipeline = dlt.pipeline(
+@st.cache_resource
+def get_pipeline():
+    return dlt.pipeline(
         pipeline_name="pokeapi_example",
         destination="duckdb",
         dataset_name="pokeapi_data"
     )
+
+@st.cache_resource(max_entries=1)
+def load_pokemon_data(load_id):
+    # Only the flat columns the charts use: name, one column per stat and the type bitmask.
+    # Kept as an immutable Arrow table shared by all sessions (no pickling or copy on a
+    # cache hit); `load_id` makes a new pipeline load replace the cached table, and
+    # max_entries=1 evicts the previous load's copy.
+    return read_columns(get_pipeline(), "pokemon", ["name", *STAT_COLUMNS, "type_mask"], as_arrow=True)
+
+@st.cache_resource(max_entries=1)
+def load_stats_index(load_id):
+    # NumPy matrix of the base stats, built once per pipeline load
+    return StatsIndex.from_arrow(load_pokemon_data(load_id))
+
+def table_browser(table, label):
+    """Search and page through a table, filtering and paging run in DuckDB"""
+    pipeline = get_pipeline()
+    search_term = st.text_input(label, key=f"{table}_search")
     
-    # Get the data from the pipeline
-    pokemon_df = pipeline.dataset().pokemon.df()
-    ability_df = pipeline.dataset().ability.df()
+    col1, col2, col3 = st.columns([3, 1, 1])
+    with col1:
+        columns = st.multiselect("Columns", table_columns(pipeline, table), key=f"{table}_columns")
+    with col2:
+        page_size = st.selectbox("Rows per page", [25, 50, 100, 250], index=1, key=f"{table}_page_size")
     
-    return pokemon_df, ability_df
+    total = count_rows(pipeline, table, search_term)
+    page_count = max(1, -(-total // page_size))
+    with col3:
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1, key=f"{table}_page")
+    
+    offset = (page - 1) * page_size
+    st.dataframe(search_table(pipeline, table, search_term, columns, limit=page_size, offset=offset))
+    st.caption(f"Showing {min(offset + 1, total)}-{min(offset + page_size, total)} of {total}")
 
 # Load the data
 try:
-    pokemon_df, ability_df = load_pokemon_data()
+    load_id = latest_load_id(get_pipeline())
+    pokemon_table = load_pokemon_data(load_id)
     
     # Create tabs for different views
     tab1, tab2, tab3 = st.tabs(["Pokemon List", "Statistics & Visualizations", "Abilities"])
     
     with tab1:
         st.subheader("Pokemon Data")
-        # Add a search box for Pokemon
-        search_term = st.text_input("Search Pokemon by name")
-        
-        if search_term:
-            filtered_df = pokemon_df[pokemon_df['name'].str.contains(search_term.lower(), na=False)]
-        else:
-            filtered_df = pokemon_df
-        
-        # Display Pokemon data
-        st.dataframe(filtered_df)
+        # Search box, column picker and paging for Pokemon
+        table_browser("pokemon", "Search Pokemon by name")
     
     with tab2:
         st.subheader("Pokemon Statistics & Visualizations")
         
-        # Basic statistics
+        # Basic statistics, precomputed by the pipeline's post-load step
+        summary = read_table(get_pipeline(), "pokemon_summary").iloc[0]
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("Total Pokemon", len(pokemon_df))
+            st.metric("Total Pokemon", int(summary['pokemon_count']))
         with col2:
-            st.metric("Total Abilities", len(ability_df))
+            st.metric("Total Abilities", int(summary['ability_count']))
         with col3:
-            st.metric("Average Base Experience", int(pokemon_df['base_experience'].mean()))
+            st.metric("Average Base Experience", int(summary['avg_base_experience']))
         
         # Stats correlation scatter plot
         st.subheader("Stats Correlation")
-        stat_x = st.selectbox("Select X-axis stat", ['hp', 'attack', 'defense', 'special-attack', 'special-defense', 'speed'])
-        stat_y = st.selectbox("Select Y-axis stat", ['hp', 'attack', 'defense', 'special-attack', 'special-defense', 'speed'], index=1)
+        stat_x = st.selectbox("Select X-axis stat", STAT_COLUMNS)
+        stat_y = st.selectbox("Select Y-axis stat", STAT_COLUMNS, index=1)
+        filter_types = st.multiselect("Only Pokemon with type", list(TYPE_BITS))
+        
+        # Type filter is a single vectorized bitmask test on the Arrow column
+        scatter_table = pokemon_table
+        if filter_types:
+            wanted_mask = sum(TYPE_BITS[name] for name in filter_types)
+            scatter_table = pokemon_table.filter(
+                pc.not_equal(pc.bit_wise_and(pokemon_table['type_mask'], wanted_mask), 0)
+            )
         
+        # Only the three plotted columns are converted
         fig_scatter = px.scatter(
-            pokemon_df,
-            x=f"stats.{stat_x}",
-            y=f"stats.{stat_y}",
+            scatter_table.select(['name', stat_x, stat_y]).to_pandas(),
+            x=stat_x,
+            y=stat_y,
             hover_data=['name'],
             title=f"{stat_x.title()} vs {stat_y.title()}"
         )
@@ -74,22 +110,39 @@ try:
         
         # Pokemon types distribution
         st.subheader("Pokemon Types Distribution")
-        type_counts = pd.Series([t['type']['name'] for types in pokemon_df['types'] for t in types]).value_counts()
+        type_counts = read_table(get_pipeline(), "pokemon_type_counts")
         fig_types = px.bar(
-            x=type_counts.index,
-            y=type_counts.values,
+            x=type_counts['type_name'],
+            y=type_counts['pokemon_count'],
             title="Pokemon Types Distribution",
             labels={'x': 'Type', 'y': 'Count'}
         )
         st.plotly_chart(fig_types)
         
+        # Per-stat summary across all Pokemon
+        st.subheader("Base Stat Summary")
+        st.dataframe(read_table(get_pipeline(), "pokemon_stat_summary"), hide_index=True)
+        
         # Individual Pokemon Stats Radar Chart
         st.subheader("Pokemon Stats Comparison")
-        selected_pokemon = st.selectbox("Select a Pokemon", pokemon_df['name'].tolist())
+        selected_pokemon = st.selectbox("Select a Pokemon", pokemon_table['name'].to_pylist())
         if selected_pokemon:
-            pokemon_stats = pokemon_df[pokemon_df['name'] == selected_pokemon].iloc[0]['stats']
-            stats_values = [stat['base_stat'] for stat in pokemon_stats]
-            stats_names = [stat['stat']['name'] for stat in pokemon_stats]
+            stats_index = load_stats_index(load_id)
+            col_radar, col_similar = st.columns([2, 1])
+            
+            # Similar Pokemon panel: one vectorized distance computation over all Pokemon
+            with col_similar:
+                st.markdown("**Similar Pokemon**")
+                metric = st.radio("Compare by", METRICS, horizontal=True,
+                                  help="euclidean: closest stat values, cosine: same stat spread")
+                top_k = st.slider("Number of results", 1, 20, 5)
+                similar = stats_index.most_similar(selected_pokemon, k=top_k, metric=metric)
+                st.dataframe(pd.DataFrame(similar, columns=['name', 'distance']), hide_index=True)
+            
+            row = pc.index(pokemon_table['name'], selected_pokemon).as_py()
+            pokemon_stats = pokemon_table.select(STAT_COLUMNS).slice(row, 1).to_pylist()[0]
+            stats_values = list(pokemon_stats.values())
+            stats_names = STAT_COLUMNS
             
             fig_radar = go.Figure()
             fig_radar.add_trace(go.Scatterpolar(
@@ -98,25 +151,38 @@ try:
                 fill='toself',
                 name=selected_pokemon
             ))
+            # Overlay the closest match for a side-by-side comparison
+            if similar:
+                closest = similar[0][0]
+                fig_radar.add_trace(go.Scatterpolar(
+                    r=stats_index.stats_for(closest).tolist(),
+                    theta=stats_names,
+                    fill='toself',
+                    opacity=0.5,
+                    name=closest
+                ))
             fig_radar.update_layout(
                 polar=dict(radialaxis=dict(visible=True, range=[0, 150])),
                 showlegend=True,
                 title=f"{selected_pokemon.title()} Stats"
             )
-            st.plotly_chart(fig_radar)
+            with col_radar:
+                st.plotly_chart(fig_radar)
     
     with tab3:
         st.subheader("Abilities Data")
-        # Add a search box for abilities
-        ability_search = st.text_input("Search abilities")
+        # Search box, column picker and paging for abilities
+        table_browser("ability", "Search abilities")
         
-        if ability_search:
-            filtered_abilities = ability_df[ability_df['name'].str.contains(ability_search.lower(), na=False)]
-        else:
-            filtered_abilities = ability_df
-        
-        # Display abilities data
-        st.dataframe(filtered_abilities)
+        # Most common abilities, precomputed by the pipeline's post-load step
+        ability_counts = read_table(get_pipeline(), "ability_counts", limit=20)
+        fig_abilities = px.bar(
+            x=ability_counts['ability_name'],
+            y=ability_counts['pokemon_count'],
+            title="Most Common Abilities",
+            labels={'x': 'Ability', 'y': 'Pokemon'}
+        )
+        st.plotly_chart(fig_abilities)
 
 except Exception as e:
     st.error(f"Error loading data: {str(e)}")
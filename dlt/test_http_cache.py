@@ -0,0 +1,104 @@
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from http_cache import cached_session
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Serves `server.bodies[path]` with an ETag and answers a matching `If-None-Match` with 304"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.request_count += 1
+        body = server.bodies[self.path]
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            with server.lock:
+                server.not_modified_count += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.request_count = 0
+    server.not_modified_count = 0
+    server.bodies = {f"/item/{i}": b'{"id": %d, "padding": "%s"}' % (i, b"x" * 100) for i in range(3)}
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_fresh_entry_is_served_without_a_request(server, tmp_path):
+    session = cached_session(tmp_path, ttl=3600)
+    first = session.get(f"{server.url}/item/0")
+    second = session.get(f"{server.url}/item/0")
+
+    assert server.request_count == 1
+    assert not getattr(first, "from_cache", False)
+    assert second.from_cache
+    assert second.json() == first.json()
+
+
+def test_stale_entry_is_revalidated(server, tmp_path):
+    session = cached_session(tmp_path, ttl=0)
+    session.get(f"{server.url}/item/0")
+    response = session.get(f"{server.url}/item/0")
+
+    assert server.request_count == 2
+    assert server.not_modified_count == 1
+    assert response.from_cache
+    assert response.json()["id"] == 0
+
+
+def test_changed_etag_refetches_the_body(server, tmp_path):
+    session = cached_session(tmp_path, ttl=0)
+    session.get(f"{server.url}/item/0")
+    server.bodies["/item/0"] = b'{"id": 0, "name": "changed"}'
+    response = session.get(f"{server.url}/item/0")
+
+    assert server.request_count == 2
+    assert server.not_modified_count == 0
+    assert not getattr(response, "from_cache", False)
+    assert response.json() == {"id": 0, "name": "changed"}
+    # The new body replaced the cached one
+    assert session.get(f"{server.url}/item/0").json()["name"] == "changed"
+
+
+def test_least_recently_used_entries_are_evicted(server, tmp_path):
+    body_size = len(server.bodies["/item/0"])
+    session = cached_session(tmp_path, ttl=3600, max_bytes=2 * body_size)
+    for i in range(3):
+        session.get(f"{server.url}/item/{i}")
+    assert server.request_count == 3
+    assert len(list(tmp_path.glob("*.body"))) == 2
+
+    # item/1 and item/2 are still cached, item/0 was evicted
+    session.get(f"{server.url}/item/2")
+    session.get(f"{server.url}/item/1")
+    assert server.request_count == 3
+    session.get(f"{server.url}/item/0")
+    assert server.request_count == 4
@@ -1,7 +1,20 @@
 import os
-from datetime import datetime
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, abort
+import base64
+import binascii
+import hashlib
+import io
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from flask import (Flask, render_template, request, redirect, url_for, flash, jsonify, abort, current_app,
+                   make_response, session)
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import and_, func, insert, or_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import joinedload
 from flask_migrate import Migrate
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from flask_wtf import FlaskForm
@@ -23,6 +36,168 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///app.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     POSTS_PER_PAGE = 10
+    # Any object with get/set/delete (and optionally add, set-if-absent) can
+    # replace the in-process LRU, e.g. a wrapper around Redis so all workers
+    # share one cache
+    RESPONSE_CACHE_BACKEND = None
+    RESPONSE_CACHE_MAX_ENTRIES = 1024
+    # Seconds a logged-in user's identity is served without a query
+    USER_CACHE_TTL = 60
+    # Rows per INSERT statement in the bulk post API
+    BULK_INSERT_CHUNK_SIZE = 1000
+
+# In-process LRU store, the default response cache backend; with a ttl,
+# entries older than ttl seconds are treated as missing
+class LRUCacheBackend:
+    def __init__(self, max_entries=1024, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            expires_at, value = self._entries[key]
+            if expires_at is not None and time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key, value):
+        with self._lock:
+            self._store(key, value)
+    
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def add(self, key, value):
+        """Store value unless the key holds a live entry, return the value kept"""
+        with self._lock:
+            if key in self._entries:
+                expires_at, current = self._entries[key]
+                if expires_at is None or time.monotonic() < expires_at:
+                    self._entries.move_to_end(key)
+                    return current
+            self._store(key, value)
+            return value
+    
+    def _store(self, key, value):
+        # The caller holds the lock
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+# Cache for rendered GET responses with strong ETags
+class ResponseCache:
+    """
+    Cached responses are grouped in namespaces ('posts' for listings,
+    'post:<id>' for a single post). Each namespace has a generation token that
+    is part of the cache key, so a write invalidates every cached page of a
+    namespace by replacing its token, which works the same on a shared backend.
+    """
+    def __init__(self, backend=None):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+    
+    def init_app(self, app):
+        self.backend = app.config.get('RESPONSE_CACHE_BACKEND') or LRUCacheBackend(
+            app.config.get('RESPONSE_CACHE_MAX_ENTRIES', 1024))
+    
+    def _generation(self, namespace):
+        key = f'generation:{namespace}'
+        generation = self.backend.get(key)
+        if generation is None:
+            # A lost token (evicted, backend restarted) starts a new random
+            # generation; a fixed default would revive pages cached under it
+            # before the first write. add() is set-if-absent, so concurrent
+            # readers agree on one token; without it a race only costs a miss.
+            generation = uuid.uuid4().hex
+            add = getattr(self.backend, 'add', None)
+            if add is not None:
+                generation = add(key, generation)
+            else:
+                self.backend.set(key, generation)
+        return generation
+    
+    def invalidate(self, *namespaces):
+        """Drop every cached response of the namespaces, call after the commit"""
+        for namespace in namespaces:
+            # A fresh token rather than a counter: concurrent writers can never
+            # end up on a token that a reader already cached stale data under
+            self.backend.set(f'generation:{namespace}', uuid.uuid4().hex)
+    
+    @staticmethod
+    def _render(view, args, kwargs):
+        """Call the view, return its response and whether it read the session"""
+        # The flag is read on the session itself: going through the proxy
+        # counts as an access
+        current_session = session._get_current_object()
+        if not hasattr(current_session, 'accessed'):
+            return make_response(view(*args, **kwargs)), True
+        accessed, current_session.accessed = current_session.accessed, False
+        response = make_response(view(*args, **kwargs))
+        uses_session = current_session.accessed
+        # Keep the flag for Flask, which adds Vary: Cookie when it is set
+        current_session.accessed = accessed or uses_session
+        return response, uses_session
+    
+    def cached(self, *namespaces, per_user=False):
+        """
+        Cache a GET view's 200 responses. Namespaces may use view arguments as
+        placeholders ('post:{post_id}'); per_user keeps separate entries for each
+        logged-in user, for pages whose template depends on current_user.
+        
+        A response whose rendering read the session (a csrf_token() in a form,
+        flashed messages) belongs to that session and is never stored, so
+        in practice only pages without such content and the JSON API are cached.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                # Flashed messages are consumed by the page that renders them
+                if request.method != 'GET' or session.get('_flashes'):
+                    return view(*args, **kwargs)
+                
+                key_parts = [f'{ns}@{self._generation(ns)}'
+                             for ns in (namespace.format(**kwargs) for namespace in namespaces)]
+                key_parts.append(request.full_path)
+                if per_user:
+                    key_parts.append(current_user.get_id() or 'anonymous')
+                key = '|'.join(key_parts)
+                
+                entry = self.backend.get(key)
+                if entry is None:
+                    self.misses += 1
+                    response, uses_session = self._render(view, args, kwargs)
+                    if response.status_code != 200 or uses_session:
+                        return response
+                    body = response.get_data()
+                    entry = (body, response.content_type, hashlib.sha256(body).hexdigest())
+                    self.backend.set(key, entry)
+                else:
+                    self.hits += 1
+                
+                body, content_type, etag = entry
+                if etag in request.if_none_match:
+                    response = current_app.response_class(status=304)
+                else:
+                    response = current_app.response_class(body, content_type=content_type)
+                response.set_etag(etag)
+                return response
+            return wrapper
+        return decorator
+
+response_cache = ResponseCache()
+
+# Identities of logged-in users, so load_user does not query on every request
+user_cache = LRUCacheBackend(max_entries=1024, ttl=Config.USER_CACHE_TTL)
 
 
 
@@ -36,6 +211,8 @@ def create_app(config_class=Config):
     migrate.init_app(app, db)
     login_manager.init_app(app)
     csrf.init_app(app)
+    response_cache.init_app(app)
+    user_cache.ttl = app.config.get('USER_CACHE_TTL', Config.USER_CACHE_TTL)
     
     # Configure login
     login_manager.login_view = 'auth.login'
@@ -86,7 +263,7 @@ class Post(db.Model):
     title = db.Column(db.String(100), nullable=False)
     content = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, index=True, default=datetime.utcnow)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), index=True)
     
     def to_dict(self):
         """Convert post to dictionary for API responses"""
@@ -101,10 +278,40 @@ class Post(db.Model):
     def __repr__(self):
         return f'<Post {self.title}>'
 
+def posts_with_authors():
+    """Post query that loads each post's author in the same SELECT (to_dict and templates read it)"""
+    return Post.query.options(joinedload(Post.author))
+
+# Read-only snapshot of a User for current_user. It holds plain values and no
+# database session, so one instance can be cached and shared between requests;
+# views compare current_user.id rather than the object itself.
+class CachedUser(UserMixin):
+    def __init__(self, user):
+        self.id = user.id
+        self.username = user.username
+        self.email = user.email
+    
+    def __repr__(self):
+        return f'<CachedUser {self.username}>'
+
 # Flask-Login user loader
 @login_manager.user_loader
 def load_user(id):
-    return User.query.get(int(id))
+    cached = user_cache.get(id)
+    if cached is None:
+        user = db.session.get(User, int(id))
+        if user is None:
+            return None
+        cached = CachedUser(user)
+        user_cache.set(id, cached)
+    return cached
+
+# Drop a cached identity as soon as its row changes or goes away. Bulk
+# query.update()/delete() calls bypass these events and rely on the TTL.
+@db.event.listens_for(User, 'after_update')
+@db.event.listens_for(User, 'after_delete')
+def invalidate_cached_user(mapper, connection, target):
+    user_cache.delete(str(target.id))
 
 # Login form using WTForms
 class LoginForm(FlaskForm):
@@ -188,9 +395,10 @@ def logout():
 
 # Main routes (normally would be in main blueprint)
 @main_bp.route('/')
+@response_cache.cached('posts', per_user=True)
 def index():
     page = request.args.get('page', 1, type=int)
-    posts = Post.query.order_by(Post.created_at.desc()).paginate(
+    posts = posts_with_authors().order_by(Post.created_at.desc()).paginate(
         page=page, per_page=current_app.config['POSTS_PER_PAGE'], error_out=False)
     return render_template('index.html', title='Home', posts=posts.items, 
                           pagination=posts)
@@ -200,17 +408,19 @@ def index():
 def new_post():
     form = PostForm()
     if form.validate_on_submit():
-        post = Post(title=form.title.data, content=form.content.data, author=current_user)
+        post = Post(title=form.title.data, content=form.content.data, user_id=current_user.id)
         db.session.add(post)
         db.session.commit()
+        response_cache.invalidate('posts')
         flash('Your post has been created!')
         return redirect(url_for('main.index'))
     
     return render_template('create_post.html', title='New Post', form=form, legend='New Post')
 
 @main_bp.route('/post/<int:post_id>')
+@response_cache.cached('post:{post_id}', per_user=True)
 def post(post_id):
-    post = Post.query.get_or_404(post_id)
+    post = posts_with_authors().get_or_404(post_id)
     return render_template('post.html', title=post.title, post=post)
 
 @main_bp.route('/post/<int:post_id>/update', methods=['GET', 'POST'])
@@ -219,7 +429,7 @@ def update_post(post_id):
     post = Post.query.get_or_404(post_id)
     
     # Check if current user is the author
-    if post.author != current_user:
+    if post.user_id != current_user.id:
         abort(403)  # Forbidden
     
     form = PostForm()
@@ -227,6 +437,7 @@ def update_post(post_id):
         post.title = form.title.data
         post.content = form.content.data
         db.session.commit()
+        response_cache.invalidate('posts', f'post:{post.id}')
         flash('Your post has been updated!')
         return redirect(url_for('main.post', post_id=post.id))
     
@@ -244,31 +455,124 @@ def delete_post(post_id):
     post = Post.query.get_or_404(post_id)
     
     # Check if current user is the author
-    if post.author != current_user:
+    if post.user_id != current_user.id:
         abort(403)  # Forbidden
     
     db.session.delete(post)
     db.session.commit()
+    response_cache.invalidate('posts', f'post:{post_id}')
     flash('Your post has been deleted!')
     return redirect(url_for('main.index'))
 
-# Admin dashboard
+# Admin dashboard: the summary comes from SQL aggregates and the user and post
+# tables are loaded page by page from the JSON endpoints below, so the view
+# costs the same however many rows there are
 @main_bp.route('/admin')
 @login_required
 @admin_required
 def admin_dashboard():
-    users = User.query.all()
-    posts = Post.query.order_by(Post.created_at.desc()).all()
+    totals = db.session.execute(db.select(
+        db.select(func.count(User.id)).scalar_subquery().label('users'),
+        db.select(func.count(Post.id)).scalar_subquery().label('posts'),
+        db.select(func.max(Post.created_at)).scalar_subquery().label('latest_post_at'),
+    )).one()
+    top_authors = db.session.execute(
+        db.select(User.username, func.count(Post.id).label('post_count'))
+        .join(Post, Post.user_id == User.id)
+        .group_by(User.id)
+        .order_by(func.count(Post.id).desc())
+        .limit(10)
+    ).all()
     return render_template('admin/dashboard.html', title='Admin Dashboard',
-                          users=users, posts=posts)
+                          totals=totals, top_authors=top_authors,
+                          users_url=url_for('main.admin_users'),
+                          posts_url=url_for('main.admin_posts'))
+
+@main_bp.route('/admin/users.json')
+@login_required
+@admin_required
+def admin_users():
+    """Users ordered by id with their post counts, ?after=<last id> for the next page"""
+    per_page = max(1, min(request.args.get('per_page', 50, type=int), 100))
+    after_id = request.args.get('after', 0, type=int)
+    
+    # Count posts only for the users of this page (uses the post.user_id index)
+    page_ids = (db.select(User.id).where(User.id > after_id)
+                .order_by(User.id).limit(per_page + 1).subquery())
+    rows = db.session.execute(
+        db.select(User.id, User.username, User.email, func.count(Post.id).label('post_count'))
+        .join(page_ids, page_ids.c.id == User.id)
+        .outerjoin(Post, Post.user_id == User.id)
+        .group_by(User.id)
+        .order_by(User.id)
+    ).all()
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+    
+    return jsonify({
+        'items': [row._asdict() for row in rows],
+        'meta': {'per_page': per_page, 'next_after': rows[-1].id if has_next else None}
+    })
+
+@main_bp.route('/admin/posts.json')
+@login_required
+@admin_required
+def admin_posts():
+    """Newest posts first without their content, ?cursor=<next_cursor> for the next page"""
+    per_page = max(1, min(request.args.get('per_page', 50, type=int), 100))
+    posts_query = (db.select(Post.id, Post.title, Post.created_at, User.username.label('author'))
+                   .outerjoin(User, User.id == Post.user_id)
+                   .order_by(Post.created_at.desc(), Post.id.desc())
+                   .limit(per_page + 1))
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            posts_query = posts_query.where(older_than(*decode_cursor(cursor)))
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+    
+    rows = db.session.execute(posts_query).all()
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+    
+    return jsonify({
+        'items': [{**row._asdict(), 'created_at': row.created_at.isoformat() + 'Z'} for row in rows],
+        'meta': {'per_page': per_page, 'next_cursor': encode_cursor(rows[-1]) if has_next else None}
+    })
+
+# Keyset pagination cursors: the (created_at, id) of the last post (or row) on
+# a page, base64-encoded so clients treat them as opaque
+def encode_cursor(post):
+    payload = json.dumps([post.created_at.isoformat(), post.id]).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+def decode_cursor(cursor):
+    """Return (created_at, id) from a cursor, raise ValueError if it is malformed"""
+    try:
+        created_at, post_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), int(post_id)
+    except (binascii.Error, UnicodeError, TypeError, ValueError) as e:
+        raise ValueError('Invalid cursor') from e
+
+def older_than(created_at, post_id):
+    """Posts that come after (created_at, id) in newest-first order"""
+    return or_(
+        Post.created_at < created_at,
+        and_(Post.created_at == created_at, Post.id < post_id),
+    )
 
 # API routes (normally would be in api blueprint)
 @api_bp.route('/posts', methods=['GET'])
+@response_cache.cached('posts')
 def get_posts():
-    page = request.args.get('page', 1, type=int)
-    per_page = min(request.args.get('per_page', 10, type=int), 100)
+    per_page = max(1, min(request.args.get('per_page', 10, type=int), 100))
+    
+    # ?cursor= (empty for the first page) switches to keyset pagination
+    if 'cursor' in request.args:
+        return get_posts_after_cursor(request.args['cursor'], per_page)
     
-    posts_query = Post.query.order_by(Post.created_at.desc())
+    page = request.args.get('page', 1, type=int)
+    posts_query = posts_with_authors().order_by(Post.created_at.desc())
     posts_page = posts_query.paginate(page=page, per_page=per_page, error_out=False)
     
     data = {
@@ -283,9 +587,39 @@ def get_posts():
     
     return jsonify(data)
 
+def get_posts_after_cursor(cursor, per_page):
+    """
+    Keyset pagination on (created_at, id): each page seeks past the last post
+    of the previous one through the created_at index instead of scanning and
+    skipping OFFSET rows, so deep pages cost the same as the first. The total
+    count is only computed when asked for with ?include_total=1.
+    """
+    posts_query = posts_with_authors().order_by(Post.created_at.desc(), Post.id.desc())
+    if cursor:
+        try:
+            created_at, post_id = decode_cursor(cursor)
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        posts_query = posts_query.filter(older_than(created_at, post_id))
+    
+    # One extra row tells whether there is a next page without counting
+    posts = posts_query.limit(per_page + 1).all()
+    has_next = len(posts) > per_page
+    posts = posts[:per_page]
+    
+    meta = {
+        'per_page': per_page,
+        'next_cursor': encode_cursor(posts[-1]) if has_next else None
+    }
+    if request.args.get('include_total', type=int):
+        meta['total_items'] = db.session.query(db.func.count(Post.id)).scalar()
+    
+    return jsonify({'items': [post.to_dict() for post in posts], 'meta': meta})
+
 @api_bp.route('/posts/<int:id>', methods=['GET'])
+@response_cache.cached('post:{id}')
 def get_post(id):
-    post = Post.query.get_or_404(id)
+    post = posts_with_authors().get_or_404(id)
     return jsonify(post.to_dict())
 
 # API token auth required decorator
@@ -316,9 +650,122 @@ def create_post():
     post = Post(title=data['title'], content=data['content'], author=user)
     db.session.add(post)
     db.session.commit()
+    response_cache.invalidate('posts')
     
     return jsonify(post.to_dict()), 201
 
+# Bulk post ingestion: the body is a JSON array of posts (or {"posts": [...]})
+# or NDJSON with one post per line (Content-Type: application/x-ndjson)
+def read_bulk_posts():
+    """Return the submitted items, None if the body is neither; a bad NDJSON line becomes None"""
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        items = []
+        # The raw request stream reads a line byte by byte, buffer it
+        for line in io.BufferedReader(request.stream, 1024 * 1024):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                items.append(None)
+        return items
+    
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('posts')
+    return data if isinstance(data, list) else None
+
+def validate_bulk_post(item):
+    """Return (row, error) for one submitted post, checked up front so no row fails the transaction"""
+    if not isinstance(item, dict):
+        return None, 'Invalid JSON object'
+    if 'title' not in item or 'content' not in item or 'user_id' not in item:
+        return None, 'Missing required fields'
+    
+    title, content, user_id = item['title'], item['content'], item['user_id']
+    if not isinstance(title, str) or not 1 <= len(title) <= 100:
+        return None, 'Title must be 1 to 100 characters'
+    if not isinstance(content, str) or not content:
+        return None, 'Content must be a non-empty string'
+    if isinstance(user_id, bool) or not isinstance(user_id, int):
+        return None, 'Invalid user ID'
+    
+    row = {'title': title, 'content': content, 'user_id': user_id}
+    # Imports may keep the original timestamp, e.g. "2024-01-31T12:00:00Z"
+    if item.get('created_at') is not None:
+        try:
+            created_at = datetime.fromisoformat(str(item['created_at']).replace('Z', '+00:00'))
+        except ValueError:
+            return None, 'Invalid created_at'
+        if created_at.tzinfo is not None:
+            created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+        row['created_at'] = created_at
+    return row, None
+
+@api_bp.route('/posts/bulk', methods=['POST'])
+@csrf.exempt
+@token_auth_required
+def create_posts_bulk():
+    """
+    Create many posts in one transaction, for imports and migrations.
+    
+    Every item gets a result in submission order: {'index', 'status': 'created', 'id'}
+    or {'index', 'status': 'error', 'error'}. Invalid items are skipped, the valid
+    ones are inserted; the response is 201 if all were created, 207 otherwise.
+    """
+    items = read_bulk_posts()
+    if items is None:
+        return jsonify({'error': 'Expected a JSON array of posts or NDJSON'}), 400
+    
+    results = [None] * len(items)
+    rows = []
+    for index, item in enumerate(items):
+        row, error = validate_bulk_post(item)
+        if error:
+            results[index] = {'index': index, 'status': 'error', 'error': error}
+        else:
+            rows.append((index, row))
+    
+    # One query for every referenced user instead of one lookup per post
+    user_ids = {row['user_id'] for _, row in rows}
+    known_ids = set(db.session.scalars(db.select(User.id).where(User.id.in_(user_ids)))) if user_ids else set()
+    valid_rows = []
+    for index, row in rows:
+        if row['user_id'] in known_ids:
+            valid_rows.append((index, row))
+        else:
+            results[index] = {'index': index, 'status': 'error', 'error': 'Invalid user ID'}
+    
+    # Multi-row INSERT ... RETURNING per chunk, all chunks in one transaction.
+    # sort_by_parameter_order returns the ids in row order, but SQLite has no
+    # way to guarantee it and falls back to one INSERT per row. There the
+    # rowids of one statement are assigned in VALUES order, so the sorted ids
+    # line up with the chunk.
+    now = datetime.utcnow()
+    chunk_size = current_app.config.get('BULK_INSERT_CHUNK_SIZE', 1000)
+    sort_ids = db.engine.dialect.name == 'sqlite'
+    statement = insert(Post).returning(Post.id, sort_by_parameter_order=not sort_ids)
+    try:
+        for start in range(0, len(valid_rows), chunk_size):
+            chunk = valid_rows[start:start + chunk_size]
+            post_ids = db.session.scalars(statement, [{'created_at': now, **row} for _, row in chunk]).all()
+            if sort_ids:
+                post_ids.sort()
+            for (index, _), post_id in zip(chunk, post_ids):
+                results[index] = {'index': index, 'status': 'created', 'id': post_id}
+        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
+        current_app.logger.exception('Bulk post insert failed')
+        return jsonify({'error': 'Bulk insert failed, no posts were created'}), 500
+    
+    if valid_rows:
+        response_cache.invalidate('posts')
+    
+    failed = len(items) - len(valid_rows)
+    return jsonify({'created': len(valid_rows), 'failed': failed, 'results': results}), 207 if failed else 201
+
 # Entry point for running the application
 if __name__ == '__main__':
     app = create_app()
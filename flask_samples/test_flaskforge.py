@@ -0,0 +1,300 @@
+"""
+Query counts of the flaskforge views, so an N+1 regression fails a test
+
+flaskforge.py takes its blueprints from an `app` package and renders templates
+that are not part of this sample. The module is executed here with stand-in
+blueprints and a render_template that reads what the templates would: every
+post's author and the flashed messages.
+"""
+import pathlib
+import types
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Blueprint, Flask, get_flashed_messages
+from sqlalchemy import event
+
+SOURCE = pathlib.Path(__file__).with_name('flaskforge.py')
+USERS = 50
+POSTS = 100
+
+
+def render_template(template, **context):
+    for post in context.get('posts') or []:
+        post.author.username
+    if 'post' in context:
+        context['post'].author.username
+    get_flashed_messages()
+    return template
+
+
+@pytest.fixture(scope='module')
+def flaskforge():
+    module = types.ModuleType('flaskforge')
+    module.__file__ = str(SOURCE)
+    module.auth_bp = Blueprint('auth', 'flaskforge')
+    module.main_bp = Blueprint('main', 'flaskforge')
+    module.api_bp = Blueprint('api', 'flaskforge')
+    exec(compile(SOURCE.read_text(encoding='utf-8'), str(SOURCE), 'exec'), module.__dict__)
+    module.render_template = render_template
+    return module
+
+
+def make_app(flaskforge, posts=POSTS):
+    """App on a fresh in-memory database with USERS users and `posts` posts"""
+    app = Flask('flaskforge')
+    app.config.from_object(flaskforge.Config)
+    app.config.update(SQLALCHEMY_DATABASE_URI='sqlite://', WTF_CSRF_ENABLED=False,
+                      API_TOKEN='test-token', TESTING=True)
+    for extension in (flaskforge.db, flaskforge.login_manager, flaskforge.csrf, flaskforge.response_cache):
+        extension.init_app(app)
+    app.register_blueprint(flaskforge.auth_bp, url_prefix='/auth')
+    app.register_blueprint(flaskforge.main_bp)
+    app.register_blueprint(flaskforge.api_bp, url_prefix='/api/v1')
+
+    with app.app_context():
+        db = flaskforge.db
+        db.create_all()
+        users = [flaskforge.User(username='admin' if i == 0 else f'user{i}', email=f'user{i}@example.org')
+                 for i in range(USERS)]
+        # Hashing is slow on purpose, all users share the one hash
+        users[0].set_password('password')
+        for user in users[1:]:
+            user.password_hash = users[0].password_hash
+        db.session.add_all(users)
+        db.session.flush()
+        # Every author distinct within a page, so lazy-loaded authors would show
+        start = datetime(2024, 1, 1)
+        db.session.add_all(flaskforge.Post(title=f'Post {i}', content='Content', user_id=users[i % USERS].id,
+                                           created_at=start + timedelta(minutes=i))
+                           for i in range(posts))
+        db.session.commit()
+
+        app.statements = []
+        event.listen(db.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: app.statements.append(statement))
+    return app
+
+
+@pytest.fixture(scope='module')
+def app(flaskforge):
+    return make_app(flaskforge)
+
+
+@pytest.fixture
+def count_queries(app, flaskforge):
+    """Return a function that sends a GET and the number of SQL statements it ran"""
+    def get(client, url, **kwargs):
+        # Measure the view itself, not a response served from the cache
+        flaskforge.response_cache.invalidate('posts', 'post:1')
+        app.statements.clear()
+        response = client.get(url, **kwargs)
+        assert response.status_code == 200, response.status_code
+        return len(app.statements)
+    return get
+
+
+@pytest.fixture
+def admin_client(app):
+    client = app.test_client()
+    client.post('/auth/login', data={'username': 'admin', 'password': 'password'})
+    # Load the identity into the user cache, so the counts below are the views' own
+    client.get('/post/new')
+    return client
+
+
+def test_index_queries(app, count_queries):
+    assert count_queries(app.test_client(), '/') == 2  # page and total count
+
+
+def test_post_queries(app, count_queries):
+    assert count_queries(app.test_client(), '/post/1') == 1
+
+
+def test_admin_dashboard_queries(admin_client, count_queries):
+    assert count_queries(admin_client, '/admin') == 2  # totals and top authors
+
+
+def test_api_posts_queries(app, count_queries):
+    client = app.test_client()
+    assert count_queries(client, '/api/v1/posts?per_page=100') == 2
+    assert count_queries(client, '/api/v1/posts?per_page=100&cursor=') == 1
+
+
+def test_api_post_queries(app, count_queries):
+    assert count_queries(app.test_client(), '/api/v1/posts/1') == 1
+
+
+def test_api_responses_are_cached(app, flaskforge, count_queries):
+    client = app.test_client()
+    count_queries(client, '/api/v1/posts/1')
+    app.statements.clear()
+    response = client.get('/api/v1/posts/1')
+    assert response.status_code == 200 and not app.statements
+
+    assert client.get('/api/v1/posts/1', headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+
+
+def test_pages_using_the_session_are_not_cached(app, flaskforge, count_queries):
+    # render_template reads the flashed messages, like a layout would
+    client = app.test_client()
+    count_queries(client, '/post/1')
+    app.statements.clear()
+    assert client.get('/post/1').status_code == 200
+    assert len(app.statements) == 1
+
+
+def test_cursor_pages_walk_every_post_once(app):
+    client = app.test_client()
+    seen, cursor, pages = [], '', 0
+    while cursor is not None:
+        body = client.get(f'/api/v1/posts?cursor={cursor}&per_page=30').get_json()
+        seen += [post['id'] for post in body['items']]
+        cursor = body['meta']['next_cursor']
+        pages += 1
+
+    assert pages == 4
+    assert len(seen) == len(set(seen)) == POSTS
+    # Newest first, the order the offset pages use as well
+    assert seen == list(range(POSTS, 0, -1))
+    assert 'total_items' not in body['meta']
+
+
+def test_cursor_page_can_include_the_total(app):
+    body = app.test_client().get('/api/v1/posts?cursor=&per_page=5&include_total=1').get_json()
+    assert body['meta']['total_items'] == POSTS
+    assert len(body['items']) == 5
+
+
+@pytest.mark.parametrize('cursor', ['not-a-cursor', 'bm90IGpzb24=', 'WzEsIDJd'])
+def test_invalid_cursor_is_rejected(app, cursor):
+    response = app.test_client().get(f'/api/v1/posts?cursor={cursor}')
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Invalid cursor'}
+
+
+@pytest.mark.parametrize('per_page, expected', [(0, 1), (-3, 1), (1000, 100)])
+def test_cursor_page_size_is_clamped(app, per_page, expected):
+    body = app.test_client().get(f'/api/v1/posts?cursor=&per_page={per_page}').get_json()
+    assert body['meta']['per_page'] == expected
+    assert len(body['items']) == expected
+
+
+@pytest.mark.parametrize('url, rows', [('/admin/users.json', USERS), ('/admin/posts.json', POSTS)])
+@pytest.mark.parametrize('per_page, expected', [(0, 1), (-2, 1), (1000, 100)])
+def test_admin_page_size_is_clamped(admin_client, url, rows, per_page, expected):
+    response = admin_client.get(f'{url}?per_page={per_page}')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['meta']['per_page'] == expected
+    assert len(body['items']) == min(expected, rows)
+
+
+def test_admin_users_pages_walk_every_user_once(admin_client, count_queries):
+    seen, after = [], 0
+    while after is not None:
+        body = admin_client.get(f'/admin/users.json?after={after}&per_page=20').get_json()
+        seen += [user['id'] for user in body['items']]
+        after = body['meta']['next_after']
+    assert seen == list(range(1, USERS + 1))
+    assert count_queries(admin_client, '/admin/users.json?per_page=20') == 1
+
+
+@pytest.fixture
+def bulk_client(flaskforge):
+    """Client of an app without posts, the bulk tests write to their own database"""
+    app = make_app(flaskforge, posts=0)
+    client = app.test_client()
+    client.environ_base['HTTP_AUTHORIZATION'] = 'Bearer test-token'
+    return client
+
+
+def stored_posts(flaskforge, app):
+    with app.app_context():
+        posts = flaskforge.db.session.scalars(flaskforge.db.select(flaskforge.Post).order_by(flaskforge.Post.id))
+        return {post.id: (post.title, post.user_id) for post in posts}
+
+
+def test_bulk_json_array(flaskforge, bulk_client):
+    items = [{'title': f'Imported {i}', 'content': 'Body', 'user_id': i % USERS + 1} for i in range(2500)]
+    items[7]['created_at'] = '2020-05-01T10:00:00+02:00'
+
+    response = bulk_client.post('/api/v1/posts/bulk', json=items)
+
+    assert response.status_code == 201
+    body = response.get_json()
+    assert (body['created'], body['failed']) == (2500, 0)
+    # Each result's id is the post made from that item, across chunks too
+    posts = stored_posts(flaskforge, bulk_client.application)
+    for item, result in zip(items, body['results']):
+        assert result['status'] == 'created'
+        assert posts[result['id']] == (item['title'], item['user_id'])
+    with bulk_client.application.app_context():
+        post = flaskforge.db.session.get(flaskforge.Post, body['results'][7]['id'])
+        assert post.created_at == datetime(2020, 5, 1, 8, 0)
+
+
+def test_bulk_ndjson_with_a_bad_line(flaskforge, bulk_client):
+    lines = ['{"title": "First", "content": "Body", "user_id": 1}', '{not json',
+             '', '{"title": "Second", "content": "Body", "user_id": 2}']
+
+    response = bulk_client.post('/api/v1/posts/bulk', data='\n'.join(lines) + '\n',
+                                content_type='application/x-ndjson')
+
+    assert response.status_code == 207
+    body = response.get_json()
+    assert (body['created'], body['failed']) == (2, 1)
+    assert [result['status'] for result in body['results']] == ['created', 'error', 'created']
+    assert body['results'][1] == {'index': 1, 'status': 'error', 'error': 'Invalid JSON object'}
+    assert sorted(title for title, _ in stored_posts(flaskforge, bulk_client.application).values()) == \
+        ['First', 'Second']
+
+
+def test_bulk_unknown_user_is_reported(flaskforge, bulk_client):
+    items = [{'title': 'Kept', 'content': 'Body', 'user_id': 1},
+             {'title': 'Orphan', 'content': 'Body', 'user_id': 9999},
+             {'title': '', 'content': 'Body', 'user_id': 1}]
+
+    response = bulk_client.post('/api/v1/posts/bulk', json=items)
+
+    assert response.status_code == 207
+    results = response.get_json()['results']
+    assert results[0]['status'] == 'created'
+    assert results[1] == {'index': 1, 'status': 'error', 'error': 'Invalid user ID'}
+    assert results[2]['error'] == 'Title must be 1 to 100 characters'
+    assert [title for title, _ in stored_posts(flaskforge, bulk_client.application).values()] == ['Kept']
+
+
+def test_bulk_checks_all_users_in_one_query(flaskforge, bulk_client):
+    app = bulk_client.application
+    items = [{'title': f'Post {i}', 'content': 'Body', 'user_id': i % USERS + 1} for i in range(2500)]
+    app.statements.clear()
+
+    assert bulk_client.post('/api/v1/posts/bulk', json=items).status_code == 201
+
+    user_queries = [statement for statement in app.statements if 'FROM user' in statement]
+    inserts = [statement for statement in app.statements if statement.startswith('INSERT INTO post')]
+    assert len(user_queries) == 1 and ' IN ' in user_queries[0]
+    assert len(inserts) == 3  # chunks of BULK_INSERT_CHUNK_SIZE (1000) rows
+
+
+def test_bulk_requires_the_token(bulk_client):
+    del bulk_client.environ_base['HTTP_AUTHORIZATION']
+    assert bulk_client.post('/api/v1/posts/bulk', json=[]).status_code == 401
+
+
+def test_lost_generation_does_not_revive_stale_pages(flaskforge):
+    app = make_app(flaskforge, posts=1)
+    client = app.test_client()
+    cache = flaskforge.response_cache
+    assert client.get('/api/v1/posts/1').get_json()['title'] == 'Post 0'
+
+    with app.app_context():
+        flaskforge.db.session.get(flaskforge.Post, 1).title = 'Edited'
+        flaskforge.db.session.commit()
+    cache.invalidate('post:1')
+    assert client.get('/api/v1/posts/1').get_json()['title'] == 'Edited'
+
+    # The backend loses the bumped token, e.g. evicted or restarted
+    cache.backend.delete('generation:post:1')
+    assert client.get('/api/v1/posts/1').get_json()['title'] == 'Edited'
@@ -0,0 +1,157 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class AlbumCache:
+    """
+    Base class of the album response caches used by `SpotifyAlbumTracker`
+
+    Values are JSON-serializable API responses keyed by album ID. Backends
+    implement `_get`, `_set` and `clear`; lookups go through `get`, which
+    keeps the hit and miss counters.
+    """
+
+    def __init__(self, ttl: float = 3600.0):
+        """
+        Args:
+            ttl: Seconds an entry is served before it counts as a miss
+        """
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached value for `key`, or None if it is missing or expired"""
+        value = self._get(key)
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any):
+        """Store `value` for `ttl` seconds"""
+        self._set(key, value)
+
+    def stats(self) -> Dict[str, float]:
+        """Hit and miss counts and the hit rate since the cache was created"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def _set(self, key: str, value: Any):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class MemoryAlbumCache(AlbumCache):
+    """In-process LRU cache, the least recently used entries go first once full"""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600.0):
+        """
+        Args:
+            max_entries: Entries kept before the least recently used is evicted
+            ttl: Seconds an entry is served before it counts as a miss
+        """
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteAlbumCache(AlbumCache):
+    """
+    On-disk cache in a SQLite file, so entries survive between runs and can
+    be shared by processes on the same machine
+    """
+
+    def __init__(self, path: str = "spotify_cache.sqlite", ttl: float = 86400.0):
+        """
+        Args:
+            path: SQLite database file, created if missing
+            ttl: Seconds an entry is served before it counts as a miss
+        """
+        super().__init__(ttl)
+        self.path = path
+        self._lock = threading.Lock()
+        # One connection shared by the tracker's threads, guarded by the lock
+        self._connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS album_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT count(*) FROM album_cache").fetchone()[0]
+
+    def _get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM album_cache WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _set(self, key: str, value: Any):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO album_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time() + self.ttl),
+            )
+
+    def clear(self):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM album_cache")
+
+    def purge_expired(self) -> int:
+        """Delete expired entries, returns how many were removed"""
+        with self._lock, self._connection:
+            return self._connection.execute(
+                "DELETE FROM album_cache WHERE expires_at <= ?", (time.time(),)
+            ).rowcount
+
+    def close(self):
+        self._connection.close()
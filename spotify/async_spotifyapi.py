@@ -0,0 +1,396 @@
+import asyncio
+import json
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+
+from album_cache import AlbumCache
+from rate_limiter import TokenBucket
+from spotifyapi import (
+    MAX_ALBUMS_PER_REQUEST,
+    MAX_TRACKS_PER_REQUEST,
+    RETRY_STATUS_CODES,
+    SpotifyClientBase,
+    album_track_total,
+    batched,
+    remaining_track_offsets,
+)
+
+
+class AsyncSpotifyAlbumTracker(SpotifyClientBase):
+    """
+    asyncio counterpart of `SpotifyAlbumTracker` for high-volume jobs
+
+    Keeps up to `concurrency` requests in flight from one event loop instead
+    of one blocking request at a time. Use it as an async context manager so
+    the connection pool is opened and closed with the loop:
+
+        async with AsyncSpotifyAlbumTracker(CLIENT_ID, CLIENT_SECRET) as tracker:
+            counts = await tracker.get_albums_track_counts(album_ids)
+    """
+
+    def __init__(self, client_id: str, client_secret: str,
+                 base_url: str = "https://api.spotify.com/v1",
+                 auth_url: str = "https://accounts.spotify.com/api/token",
+                 concurrency: int = 100,
+                 timeout: float = 30.0,
+                 max_retries: int = 5,
+                 backoff_factor: float = 0.5,
+                 max_backoff: float = 60.0,
+                 refresh_margin: float = 60.0,
+                 cache: Optional[AlbumCache] = None,
+                 rate_limiter: Optional[TokenBucket] = None):
+        """
+        Initialize the async Spotify API client
+
+        Args:
+            client_id: Your Spotify app client ID
+            client_secret: Your Spotify app client secret
+            base_url: Web API root, can point at a local stand-in server
+            auth_url: Token endpoint used for the Client Credentials flow
+            concurrency: Most requests in flight at once, also the size of
+                the connection pool
+            timeout: Seconds a single request may take in total
+            max_retries: Retries for 429, 5xx and connection errors
+            backoff_factor: Base delay in seconds of the exponential backoff
+            max_backoff: Upper bound for a single wait between retries
+            refresh_margin: Seconds before expiry at which the token is refreshed
+            cache: Optional `AlbumCache` for album responses and track lists,
+                shared with or built like the one of `SpotifyAlbumTracker`
+            rate_limiter: Optional `TokenBucket`; its delay is awaited, so
+                waiting requests do not block the event loop
+        """
+        super().__init__(client_id, client_secret, base_url, auth_url, max_retries,
+                         backoff_factor, max_backoff, refresh_margin, cache, rate_limiter)
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.session: Optional[aiohttp.ClientSession] = None
+        # Requests wait here once `concurrency` of them are in flight
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._token_lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def open(self):
+        """Open the pooled session, called on first use if not done explicitly"""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.concurrency)
+            self.session = aiohttp.ClientSession(
+                connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+
+    async def close(self):
+        """Close the pooled connections"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def _request(self, method: str, url: str, **kwargs) -> Tuple[int, Optional[dict]]:
+        """
+        Send a request within the concurrency limit, retrying on 429, 5xx
+        and connection errors
+
+        Returns:
+            tuple: Status code of the last response and its decoded JSON body
+            (None if the body is not JSON)
+
+        Raises:
+            aiohttp.ClientError, asyncio.TimeoutError: When the last retry
+            still could not connect
+        """
+        await self.open()
+        attempt = 0
+        while True:
+            retry_after = None
+            if self.rate_limiter is not None:
+                if self.rate_limiter.reserve_blocks:
+                    # A file lock held by another process must not stall the loop
+                    delay = await asyncio.to_thread(self.rate_limiter.reserve)
+                else:
+                    delay = self.rate_limiter.reserve()
+                if delay:
+                    await asyncio.sleep(delay)
+            try:
+                # The slot is released while backing off, so waiting retries
+                # do not hold back other requests
+                async with self._semaphore:
+                    async with self.session.request(method, url, **kwargs) as response:
+                        status = response.status
+                        retry_after = response.headers.get("Retry-After")
+                        try:
+                            body = await response.json(content_type=None)
+                        except (json.JSONDecodeError, ValueError):
+                            body = None
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt >= self.max_retries:
+                    raise
+            else:
+                if status not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    return status, body
+            await asyncio.sleep(self._backoff_delay(attempt, retry_after))
+            attempt += 1
+
+    async def get_access_token(self, force_refresh: bool = False) -> bool:
+        """
+        Get access token using Client Credentials flow
+
+        Returns:
+            bool: True if token obtained successfully, False otherwise
+        """
+        async with self._token_lock:
+            if not force_refresh and self.token_is_fresh():
+                return True
+            return await self._request_access_token()
+
+    async def ensure_access_token(self) -> bool:
+        """
+        Make sure a fresh token is held; concurrent callers share one refresh
+
+        Returns:
+            bool: True if a usable token is available
+        """
+        if self.token_is_fresh():
+            return True
+        async with self._token_lock:
+            if self.token_is_fresh():
+                return True
+            return await self._request_access_token()
+
+    async def _request_access_token(self) -> bool:
+        """Request a new token, the caller must hold `_token_lock`"""
+        if self.auth_failed:
+            return False
+        try:
+            status, token_data = await self._request("POST", self.auth_url, data=self._token_request_data())
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"❌ Error getting access token: {e}")
+            return False
+
+        if not self._accept_token(status, token_data):
+            print(f"❌ Failed to obtain access token (HTTP {status})")
+            return False
+        print("✅ Successfully obtained access token")
+        return True
+
+    async def _refresh_rejected_token(self, rejected_token: Optional[str]) -> bool:
+        """Replace a token the API answered 401 for, unless another task already did"""
+        async with self._token_lock:
+            if self.access_token != rejected_token and self.token_is_fresh():
+                return True
+            self.access_token = None
+            self.token_expires_at = 0.0
+            return await self._request_access_token()
+
+    async def _api_get(self, url: str, **kwargs) -> Tuple[int, Optional[dict]]:
+        """GET a Web API URL, refreshing the token and retrying once on 401"""
+        token = self.access_token
+        status, body = await self._request("GET", url, headers=self._auth_headers(token), **kwargs)
+        if status == 401 and await self._refresh_rejected_token(token):
+            status, body = await self._request(
+                "GET", url, headers=self._auth_headers(self.access_token), **kwargs
+            )
+        return status, body
+
+    async def get_album(self, album_id: str) -> Optional[dict]:
+        """
+        Get a Spotify album object
+
+        Returns:
+            dict: The album as returned by the API, or None if error
+        """
+        album_data = self._cache_get(album_id)
+        if album_data is not None:
+            return album_data
+        if not await self.ensure_access_token():
+            print("❌ No access token available. Please authenticate first.")
+            return None
+        try:
+            status, album_data = await self._api_get(f"{self.base_url}/albums/{album_id}")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"❌ Request Error for album {album_id}: {e}")
+            return None
+
+        if status == 404:
+            print(f"❌ Album not found. Please check the album ID: {album_id}")
+            return None
+        if status != 200 or album_data is None:
+            print(f"❌ HTTP Error {status} for album {album_id}")
+            return None
+        self._cache_set(album_id, album_data)
+        return album_data
+
+    async def get_album_tracks_count(self, album_id: str) -> Optional[int]:
+        """
+        Get the number of tracks in a Spotify album
+
+        Returns:
+            int: Number of tracks in the album, or None if error
+        """
+        album_data = await self.get_album(album_id)
+        if album_data is None:
+            return None
+        return album_track_total(album_data)
+
+    async def get_album_tracks(self, album_id: str, album_data: Optional[dict] = None) -> Optional[List[dict]]:
+        """
+        Get every track of an album, fetching all pages after the embedded
+        first one concurrently from offsets computed with `tracks.total`
+
+        Args:
+            album_id: The Spotify album ID
+            album_data: Album object already fetched, saves one request
+
+        Returns:
+            list: Track objects in album order, or None if a page failed
+        """
+        cached_tracks = self._cache_get(f"{album_id}/tracks")
+        if cached_tracks is not None:
+            return cached_tracks
+        if album_data is None:
+            album_data = await self.get_album(album_id)
+            if album_data is None:
+                return None
+
+        async def fetch_page(offset: int) -> Optional[List[dict]]:
+            status, page = await self._api_get(
+                f"{self.base_url}/albums/{album_id}/tracks",
+                params={"offset": offset, "limit": MAX_TRACKS_PER_REQUEST},
+            )
+            if status != 200 or not isinstance(page, dict):
+                print(f"❌ HTTP Error {status} for tracks {offset}+ of album {album_id}")
+                return None
+            return page.get("items", [])
+
+        tracks = list((album_data.get("tracks") or {}).get("items", []))
+        try:
+            pages = await asyncio.gather(*(fetch_page(o) for o in remaining_track_offsets(album_data)))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"❌ Request Error for tracks of album {album_id}: {e}")
+            return None
+        if any(items is None for items in pages):
+            return None
+        for items in pages:
+            tracks.extend(items)
+        self._cache_set(f"{album_id}/tracks", tracks)
+        return tracks
+
+    async def _albums_chunk_track_counts(self, chunk: list) -> Dict[str, Optional[int]]:
+        """Track counts for up to 20 albums from one `/albums?ids=` request"""
+        try:
+            status, body = await self._api_get(
+                f"{self.base_url}/albums", params={"ids": ",".join(chunk)}
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            status, body = None, e
+        if status != 200 or not isinstance(body, dict):
+            print(f"❌ Error fetching albums {chunk[0]}..{chunk[-1]}: {status or body}")
+            return {album_id: None for album_id in chunk}
+
+        albums = self._chunk_albums(chunk, body.get("albums", []))
+        return {album_id: album_track_total(album_data) if album_data is not None else None
+                for album_id, album_data in albums.items()}
+
+    async def iter_albums_track_counts(
+        self, album_ids: Iterable[str]
+    ) -> AsyncIterator[Tuple[str, Optional[int]]]:
+        """
+        Look up track counts for many albums, 20 albums per request, and
+        yield them as the requests finish rather than in input order
+
+            async for album_id, count in tracker.iter_albums_track_counts(ids):
+                ...
+
+        Yields:
+            tuple: `(album_id, track_count)`, the count is None for albums
+            that were not found or whose request failed
+        """
+        # Cached albums are yielded right away, only the rest is requested
+        missing_ids = []
+        for album_id in dict.fromkeys(album_ids):
+            album_data = self._cache_get(album_id)
+            if album_data is None:
+                missing_ids.append(album_id)
+            else:
+                yield album_id, album_track_total(album_data)
+        if not missing_ids:
+            return
+        if not await self.ensure_access_token():
+            print("❌ No access token available. Please authenticate first.")
+            for album_id in missing_ids:
+                yield album_id, None
+            return
+
+        # All chunks are scheduled at once, the semaphore caps what is in flight
+        tasks = [
+            asyncio.ensure_future(
+                self._albums_chunk_track_counts(missing_ids[start:start + MAX_ALBUMS_PER_REQUEST])
+            )
+            for start in range(0, len(missing_ids), MAX_ALBUMS_PER_REQUEST)
+        ]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                for album_id, count in (await finished).items():
+                    yield album_id, count
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def get_albums_track_counts(self, album_ids: Iterable[str]) -> Dict[str, Optional[int]]:
+        """
+        Get the number of tracks for many albums concurrently
+
+        Returns:
+            dict: Track count per album ID, None for albums that were not
+            found or whose request failed
+        """
+        return {album_id: count async for album_id, count in self.iter_albums_track_counts(album_ids)}
+
+
+async def run_batch_async(tracker: AsyncSpotifyAlbumTracker, album_ids: Iterable[str], reporter):
+    """
+    Count tracks for a stream of album IDs with the async client
+
+    IDs are read lazily and at most two requests per concurrency slot are
+    scheduled at a time, so memory stays flat however many IDs are read.
+    Results are passed to `reporter.report` (a `BatchReporter`) as they finish.
+
+    Returns:
+        bool: False if no access token could be obtained, before any ID is read
+    """
+    async with tracker:
+        if not await tracker.ensure_access_token():
+            return False
+        pending = set()
+        for chunk in batched(album_ids, MAX_ALBUMS_PER_REQUEST):
+            if len(pending) >= tracker.concurrency * 2:
+                finished, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    reporter.report(task.result())
+            pending.add(asyncio.ensure_future(tracker.get_albums_track_counts(chunk)))
+        if pending:
+            for task in (await asyncio.wait(pending))[0]:
+                reporter.report(task.result())
+    return True
+
+
+async def main():
+    """
+    Count the tracks of the example albums concurrently
+    """
+    CLIENT_ID = "placeholder1"
+    CLIENT_SECRET = "placeholder2"
+
+    album_ids = ["0ETFjACtuP2ADo6LFhL6HN", "2ANVost0y2y52ema1E9xAZ", "4LH4d3cOWNNsVw41Gqt2kv"]
+
+    async with AsyncSpotifyAlbumTracker(CLIENT_ID, CLIENT_SECRET) as tracker:
+        async for album_id, count in tracker.iter_albums_track_counts(album_ids):
+            print(f"{album_id}: {count if count is not None else 'not found'}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,242 @@
+import argparse
+import json
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Spotify embeds at most this many tracks in an album object
+EMBEDDED_TRACKS_LIMIT = 50
+MAX_TRACKS_PAGE = 50
+# Extra seconds an `/albums?ids=` request with an ID starting with `slow` takes
+SLOW_ALBUM_LATENCY = 0.3
+
+
+def track_count(album_id):
+    """
+    Number of tracks of a fake album: IDs ending in `-<n>` have n tracks,
+    other IDs get a stable count between 1 and 30
+    """
+    match = re.search(r"-(\d+)$", album_id)
+    if match:
+        return int(match.group(1))
+    return 1 + zlib.crc32(album_id.encode("utf-8")) % 30
+
+
+def album_exists(album_id):
+    return not album_id.startswith("missing")
+
+
+def album_id_valid(album_id):
+    """IDs starting with `invalid` are rejected with 400, like malformed IDs upstream"""
+    return not album_id.startswith("invalid")
+
+
+def track_page(base_url, album_id, offset, limit):
+    total = track_count(album_id)
+    items = [
+        {
+            "id": f"{album_id}-track-{number}",
+            "name": f"Track {number}",
+            "track_number": number,
+            "disc_number": 1,
+            "duration_ms": 120000 + number * 1000,
+        }
+        for number in range(offset + 1, min(offset + limit, total) + 1)
+    ]
+    next_offset = offset + limit
+    return {
+        "href": f"{base_url}/albums/{album_id}/tracks?offset={offset}&limit={limit}",
+        "items": items,
+        "limit": limit,
+        "offset": offset,
+        "total": total,
+        "next": (
+            f"{base_url}/albums/{album_id}/tracks?offset={next_offset}&limit={limit}"
+            if next_offset < total else None
+        ),
+    }
+
+
+def album_record(base_url, album_id):
+    return {
+        "id": album_id,
+        "name": f"Album {album_id}",
+        "album_type": "album",
+        "release_date": "2000-01-01",
+        "total_tracks": track_count(album_id),
+        "artists": [{"id": "artist-1", "name": "Mock Artist"}],
+        "tracks": track_page(base_url, album_id, 0, EMBEDDED_TRACKS_LIMIT),
+    }
+
+
+class MockSpotifyHandler(BaseHTTPRequestHandler):
+    """
+    Serves the token endpoint (`POST /api/token`) and the album endpoints of
+    the Web API under `/v1`: `/albums/{id}`, `/albums?ids=` and
+    `/albums/{id}/tracks`
+    """
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _count(self):
+        """Count the request, return True when it is over the rate limit"""
+        server = self.server
+        with server.lock:
+            server.request_count += 1
+            # Released in _send, which every request ends with
+            server.in_flight += 1
+            server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+            throttled = False
+            if server.rate_limit:
+                now = time.monotonic()
+                if now - server.window_start >= 1.0:
+                    server.window_start, server.window_count = now, 0
+                server.window_count += 1
+                throttled = server.window_count > server.rate_limit
+                if throttled:
+                    server.throttled_count += 1
+        if server.latency:
+            time.sleep(server.latency)
+        return throttled
+
+    def _throttle(self):
+        return self._send(
+            429, {"error": {"status": 429, "message": "API rate limit exceeded"}},
+            headers={"Retry-After": str(self.server.retry_after)},
+        )
+
+    def do_POST(self):
+        # Read the body first: left unread, it would be taken for the next
+        # request on the kept-alive connection
+        length = int(self.headers.get("Content-Length", 0))
+        form = parse_qs(self.rfile.read(length).decode("utf-8"))
+        if self._count():
+            return self._throttle()
+        if urlparse(self.path).path != "/api/token":
+            return self._send(404, {"error": "not found"})
+        if form.get("grant_type") != ["client_credentials"] or not form.get("client_id"):
+            return self._send(400, {"error": "invalid_request"})
+        with self.server.lock:
+            self.server.tokens_issued += 1
+            token = f"token-{self.server.tokens_issued}"
+            self.server.token_expiry[token] = time.monotonic() + self.server.token_ttl
+        return self._send(
+            200, {"access_token": token, "token_type": "Bearer", "expires_in": self.server.token_ttl}
+        )
+
+    def do_GET(self):
+        if self._count():
+            return self._throttle()
+        url = urlparse(self.path)
+        parts = url.path.strip("/").split("/")
+        query = parse_qs(url.query)
+        base_url = f"http://{self.headers['Host']}/v1"
+
+        token = self.headers.get("Authorization", "").removeprefix("Bearer ")
+        expires_at = self.server.token_expiry.get(token)
+        if expires_at is None:
+            return self._send(401, {"error": {"status": 401, "message": "Invalid access token"}})
+        if time.monotonic() >= expires_at:
+            return self._send(401, {"error": {"status": 401, "message": "The access token expired"}})
+
+        if parts == ["v1", "albums"]:
+            ids = query.get("ids", [""])[0].split(",")
+            if len(ids) > 20:
+                return self._send(400, {"error": {"status": 400, "message": "Too many ids requested"}})
+            if not all(album_id_valid(i) for i in ids):
+                return self._send(400, {"error": {"status": 400, "message": "invalid id"}})
+            if any(i.startswith("slow") for i in ids):
+                time.sleep(SLOW_ALBUM_LATENCY)
+            albums = [album_record(base_url, i) if album_exists(i) else None for i in ids]
+            return self._send(200, {"albums": albums})
+
+        if len(parts) in (3, 4) and parts[:2] == ["v1", "albums"]:
+            album_id = parts[2]
+            if not album_exists(album_id):
+                return self._send(404, {"error": {"status": 404, "message": "Non existing id"}})
+            if len(parts) == 3:
+                return self._send(200, album_record(base_url, album_id))
+            if parts[3] == "tracks":
+                offset = int(query.get("offset", [0])[0])
+                limit = min(int(query.get("limit", [20])[0]), MAX_TRACKS_PAGE)
+                return self._send(200, track_page(base_url, album_id, offset, limit))
+
+        return self._send(404, {"error": {"status": 404, "message": "Service not found"}})
+
+    def _send(self, status, body, headers=None):
+        payload = json.dumps(body).encode("utf-8")
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+        finally:
+            with self.server.lock:
+                self.server.in_flight -= 1
+
+
+class MockSpotifyServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops bursts of new connections from
+    # concurrent clients, which then stall on SYN retransmits
+    request_queue_size = 128
+
+
+def start_mock_spotify(latency=0.0, port=0, rate_limit=None, retry_after=1, token_ttl=3600):
+    """
+    Start a local stand-in for the Spotify accounts and Web API on a thread
+
+    Args:
+        latency: Seconds every request is delayed by
+        port: Port to listen on, a free one is picked by default
+        rate_limit: Requests allowed per second, the rest get 429
+        retry_after: Value of the Retry-After header sent with a 429
+        token_ttl: Seconds an issued token is accepted for
+
+    Returns:
+        tuple: The running server (with `request_count`, `throttled_count`,
+        `tokens_issued` and `peak_in_flight` attributes), the `base_url` and
+        the `auth_url` to pass to `SpotifyAlbumTracker`
+    """
+    server = MockSpotifyServer(("127.0.0.1", port), MockSpotifyHandler)
+    server.latency = latency
+    server.rate_limit = rate_limit
+    server.retry_after = retry_after
+    server.window_start = time.monotonic()
+    server.window_count = 0
+    server.throttled_count = 0
+    server.request_count = 0
+    server.tokens_issued = 0
+    server.in_flight = 0
+    server.peak_in_flight = 0
+    server.token_ttl = token_ttl
+    server.token_expiry = {}
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    root = f"http://127.0.0.1:{server.server_address[1]}"
+    return server, f"{root}/v1", f"{root}/api/token"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the Spotify album API")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--rate-limit", type=int, help="requests per second before answering 429")
+    args = parser.parse_args()
+
+    server, base_url, auth_url = start_mock_spotify(args.latency, args.port, args.rate_limit)
+    print(f"Mock Spotify API at {base_url}, token endpoint {auth_url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
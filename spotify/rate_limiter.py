@@ -0,0 +1,108 @@
+import os
+import struct
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter shared by the threads of one process
+
+    Allows `requests` requests per `window` seconds. Callers either block in
+    `acquire()` or take the delay from `reserve()` and wait themselves, which
+    is how the async client sleeps without blocking the event loop.
+    """
+
+    # True if reserve() can wait on other processes, the async client then
+    # calls it from a worker thread
+    reserve_blocks = False
+
+    def __init__(self, requests: float, window: float = 1.0, burst: float = 1.0):
+        """
+        Args:
+            requests: Requests allowed per window
+            window: Window length in seconds
+            burst: Requests that may go out back to back after an idle
+                period; 1 spaces all requests evenly
+        """
+        if requests <= 0 or window <= 0:
+            raise ValueError("requests and window must be positive")
+        self.rate = requests / window
+        self.capacity = max(1.0, burst)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self, tokens: float, updated_at: float, now: float):
+        """
+        Refill the bucket for the time since `updated_at` and take one token
+
+        Returns:
+            tuple: New token count (negative while requests are queued) and
+            the seconds the caller has to wait for its token
+        """
+        tokens = min(self.capacity, tokens + (now - updated_at) * self.rate) - 1
+        return tokens, max(0.0, -tokens / self.rate)
+
+    def reserve(self) -> float:
+        """Reserve the next request slot, returns the seconds to wait until it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens, delay = self._take(self._tokens, self._updated_at, now)
+            self._updated_at = now
+        return delay
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+
+class FileTokenBucket(TokenBucket):
+    """
+    Token bucket kept in a small file under an `fcntl` lock, so worker
+    processes on the same machine share one budget
+
+    Every process opens the same `path` with the same limits. The bucket state
+    is two doubles: the token count and the wall-clock time of the last update.
+    """
+
+    _STATE = struct.Struct("dd")
+    reserve_blocks = True
+
+    def __init__(self, path: str, requests: float, window: float = 1.0, burst: float = 1.0):
+        """
+        Args:
+            path: State file, created on first use
+            requests: Requests allowed per window across all processes
+            window: Window length in seconds
+            burst: Requests that may go out back to back after an idle period
+        """
+        if fcntl is None:
+            raise RuntimeError("FileTokenBucket needs fcntl, which is not available on this platform")
+        super().__init__(requests, window, burst)
+        self.path = path
+
+    def reserve(self) -> float:
+        # A separate open file per call, so threads also exclude each other
+        # through the lock and not only processes
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            data = os.pread(fd, self._STATE.size, 0)
+            now = time.time()
+            if len(data) == self._STATE.size:
+                tokens, updated_at = self._STATE.unpack(data)
+            else:
+                tokens, updated_at = self.capacity, now
+            tokens, delay = self._take(tokens, updated_at, now)
+            os.pwrite(fd, self._STATE.pack(tokens, now), 0)
+        finally:
+            os.close(fd)  # also releases the lock
+        return delay
@@ -1,90 +1,456 @@
 import requests
+import argparse
+import contextlib
+import itertools
 import json
-from typing import Optional
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+from urllib.parse import urlparse
 
-class SpotifyAlbumTracker:
-    def __init__(self, client_id: str, client_secret: str):
+from requests.adapters import HTTPAdapter
+
+from album_cache import AlbumCache, MemoryAlbumCache, SQLiteAlbumCache
+from rate_limiter import FileTokenBucket, TokenBucket
+
+# Spotify's /albums endpoint accepts at most this many IDs per request
+MAX_ALBUMS_PER_REQUEST = 20
+
+# Largest page of /albums/{id}/tracks; the album object embeds the first page
+MAX_TRACKS_PER_REQUEST = 50
+
+# Responses that are retried: rate limiting and transient server errors
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header given either in seconds or as an HTTP date
+    
+    Returns:
+        float: Seconds to wait, or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def album_track_total(album_data: dict) -> int:
+    """
+    Number of tracks of an album object. `tracks.total` counts every track,
+    `tracks.items` only holds the first page of them.
+    """
+    tracks = album_data.get("tracks") or {}
+    total = tracks.get("total", album_data.get("total_tracks"))
+    return total if total is not None else len(tracks.get("items", []))
+
+def remaining_track_offsets(album_data: dict) -> List[int]:
+    """Offsets of the /albums/{id}/tracks pages after the embedded first page"""
+    embedded = len((album_data.get("tracks") or {}).get("items", []))
+    return list(range(embedded, album_track_total(album_data), MAX_TRACKS_PER_REQUEST))
+
+def batched(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    """Consecutive lists of `size` items, read lazily from `items`"""
+    iterator = iter(items)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+class SpotifyClientBase:
+    """
+    State and request-free helpers shared by `SpotifyAlbumTracker` and the
+    asyncio `AsyncSpotifyAlbumTracker`: the access token, the backoff
+    schedule, cache access and the reading of `/albums?ids=` replies.
+    Subclasses add the I/O, with blocking calls or on the event loop.
+    """
+    
+    def __init__(self, client_id: str, client_secret: str, base_url: str, auth_url: str,
+                 max_retries: int, backoff_factor: float, max_backoff: float,
+                 refresh_margin: float, cache: Optional[AlbumCache],
+                 rate_limiter: Optional[TokenBucket]):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.base_url = base_url
+        self.auth_url = auth_url
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.refresh_margin = refresh_margin
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.access_token = None
+        self.token_expires_at = 0.0
+        # Set when the token endpoint rejects the credentials; no further
+        # token requests are sent, they would all fail the same way
+        self.auth_failed = False
+    
+    def token_is_fresh(self) -> bool:
+        """True if the token is set and not within `refresh_margin` of expiring"""
+        return (self.access_token is not None
+                and time.time() < self.token_expires_at - self.refresh_margin)
+    
+    def _token_request_data(self) -> Dict[str, str]:
+        """Form body of a Client Credentials token request"""
+        return {
+            "grant_type": "client_credentials",
+            "client_id": self.client_id,
+            "client_secret": self.client_secret
+        }
+    
+    def _accept_token(self, status: int, token_data: Optional[dict]) -> bool:
+        """
+        Adopt the token from a token endpoint reply
+        
+        Returns:
+            bool: True if the reply carried a token
+        """
+        # 4xx: wrong credentials or token URL, asking again cannot help.
+        # 429 is only throttling, already retried by _request
+        if 400 <= status < 500 and status not in RETRY_STATUS_CODES:
+            self.auth_failed = True
+        if status != 200 or not isinstance(token_data, dict) or not token_data.get("access_token"):
+            return False
+        self.access_token = token_data["access_token"]
+        self.token_expires_at = time.time() + float(token_data.get("expires_in", 3600))
+        return True
+    
+    def _backoff_delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        """Seconds to wait before retry number `attempt` (starting at 0)"""
+        delay = parse_retry_after(retry_after)
+        if delay is not None:
+            return min(delay, self.max_backoff)
+        # Exponential backoff with full jitter spreads out retrying workers
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** attempt))
+    
+    def _cache_get(self, key: str) -> Optional[object]:
+        return self.cache.get(key) if self.cache is not None else None
+    
+    def _cache_set(self, key: str, value: object):
+        if self.cache is not None:
+            self.cache.set(key, value)
+    
+    @staticmethod
+    def _auth_headers(token: Optional[str]) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json"
+        }
+    
+    def _chunk_albums(self, chunk: List[str], albums: list) -> Dict[str, Optional[dict]]:
+        """
+        Album object per ID of one `/albums?ids=` request; albums come back
+        in request order, unknown IDs as null entries that map to None.
+        Found albums are cached.
+        """
+        results: Dict[str, Optional[dict]] = dict.fromkeys(chunk)
+        for album_id, album_data in zip(chunk, albums):
+            if album_data is not None:
+                results[album_id] = album_data
+                self._cache_set(album_id, album_data)
+        return results
+
+class SpotifyAlbumTracker(SpotifyClientBase):
+    def __init__(self, client_id: str, client_secret: str,
+                 base_url: str = "https://api.spotify.com/v1",
+                 auth_url: str = "https://accounts.spotify.com/api/token",
+                 pool_size: int = 10,
+                 timeout: Union[float, Tuple[float, float]] = (3.05, 15),
+                 max_retries: int = 5,
+                 backoff_factor: float = 0.5,
+                 max_backoff: float = 60.0,
+                 refresh_margin: float = 60.0,
+                 token_file: Optional[str] = None,
+                 cache: Optional[AlbumCache] = None,
+                 rate_limiter: Optional[TokenBucket] = None):
         """
         Initialize the Spotify API client
         
         Args:
             client_id: Your Spotify app client ID
             client_secret: Your Spotify app client secret
+            base_url: Web API root, can point at a local stand-in server
+            auth_url: Token endpoint used for the Client Credentials flow
+            pool_size: Connections kept open per host, set it to the number
+                of threads sharing the tracker
+            timeout: Seconds to wait for a connection and for a response,
+                as one number or a (connect, read) tuple
+            max_retries: Retries for 429, 5xx and connection errors
+            backoff_factor: Base delay in seconds of the exponential backoff
+            max_backoff: Upper bound for a single wait between retries
+            refresh_margin: Seconds before expiry at which the token is
+                refreshed, so no request is sent with an expiring token
+            token_file: Optional path where the token is kept between runs,
+                so short-lived invocations skip the token request
+            cache: Optional `AlbumCache` for album responses and track
+                lists, repeat lookups are then served without a request
+            rate_limiter: Optional `TokenBucket` every request waits on,
+                share one between trackers to stay under a common budget
         """
-        self.client_id = client_id
-        self.client_secret = client_secret
-        self.access_token = None
-        self.base_url = "https://api.spotify.com/v1"
+        super().__init__(client_id, client_secret, base_url, auth_url, max_retries,
+                         backoff_factor, max_backoff, refresh_margin, cache, rate_limiter)
+        self.token_file = token_file
+        # Held while a token is requested, so concurrent callers wait for
+        # that one refresh instead of starting their own
+        self._token_lock = threading.Lock()
+        self.timeout = timeout
+        self.pool_size = pool_size
+        
+        # One pooled session so connections (and TLS handshakes) are reused
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
     
-    def get_access_token(self) -> bool:
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def close(self):
+        """Close the pooled connections"""
+        self.session.close()
+    
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request on the pooled session, retrying on 429, 5xx and
+        connection errors
+        
+        Returns:
+            Response: The last response; error statuses are left for the
+            caller to handle with raise_for_status()
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                response = None
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    return response
+            retry_after = response.headers.get("Retry-After") if response is not None else None
+            time.sleep(self._backoff_delay(attempt, retry_after))
+            attempt += 1
+    
+    def get_access_token(self, force_refresh: bool = False) -> bool:
         """
         Get access token using Client Credentials flow
         
+        A fresh token already held, or kept in `token_file`, is reused
+        unless `force_refresh` is set.
+        
         Returns:
             bool: True if token obtained successfully, False otherwise
         """
-        auth_url = "https://accounts.spotify.com/api/token"
+        with self._token_lock:
+            if not force_refresh and (self.token_is_fresh() or self._load_token_file()):
+                return True
+            return self._request_access_token()
+    
+    def ensure_access_token(self) -> bool:
+        """
+        Make sure a fresh token is held, refreshing it when it is about to
+        expire. Safe to call from many threads, only one refresh is sent.
         
+        Returns:
+            bool: True if a usable token is available
+        """
+        if self.token_is_fresh():
+            return True
+        with self._token_lock:
+            # Another thread may have refreshed while this one waited, or
+            # an earlier run may have left a fresh token in `token_file`
+            if self.token_is_fresh() or self._load_token_file():
+                return True
+            return self._request_access_token()
+    
+    def _request_access_token(self) -> bool:
+        """Request a new token, the caller must hold `_token_lock`"""
+        if self.auth_failed:
+            return False
         auth_headers = {
             "Content-Type": "application/x-www-form-urlencoded"
         }
         
-        auth_data = {
-            "grant_type": "client_credentials",
+        try:
+            response = self._request("POST", self.auth_url, headers=auth_headers,
+                                     data=self._token_request_data())
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Error getting access token: {e}")
+            return False
+        try:
+            token_data = response.json()
+        except ValueError:
+            token_data = None
+        
+        if not self._accept_token(response.status_code, token_data):
+            print(f"❌ Failed to obtain access token (HTTP {response.status_code})")
+            return False
+        self._save_token_file()
+        print("✅ Successfully obtained access token")
+        return True
+    
+    def _refresh_rejected_token(self, rejected_token: Optional[str]) -> bool:
+        """
+        Replace a token the API answered 401 for
+        
+        Returns:
+            bool: True if a different token is now available
+        """
+        with self._token_lock:
+            if self.access_token != rejected_token and self.token_is_fresh():
+                return True
+            self.access_token = None
+            self.token_expires_at = 0.0
+            return self._request_access_token()
+    
+    def _load_token_file(self) -> bool:
+        """Adopt the token kept in `token_file` if it belongs to this client and is fresh"""
+        if not self.token_file:
+            return False
+        try:
+            with open(self.token_file, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if not isinstance(data, dict) or data.get("client_id") != self.client_id:
+            return False
+        self.access_token = data.get("access_token")
+        self.token_expires_at = float(data.get("expires_at", 0))
+        return self.token_is_fresh()
+    
+    def _save_token_file(self):
+        if not self.token_file:
+            return
+        data = {
             "client_id": self.client_id,
-            "client_secret": self.client_secret
+            "access_token": self.access_token,
+            "expires_at": self.token_expires_at,
         }
+        temp_path = f"{self.token_file}.{os.getpid()}.tmp"
+        try:
+            # The token grants API access, keep it readable by the owner only
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.token_file)
+        except OSError as e:
+            print(f"⚠️ Could not save access token to {self.token_file}: {e}")
+    
+    def _api_get(self, url: str, **kwargs) -> requests.Response:
+        """
+        GET a Web API URL with the current token, refreshing the token and
+        retrying once if it is rejected with 401
+        """
+        token = self.access_token
+        response = self._request("GET", url, headers=self._auth_headers(token), **kwargs)
+        if response.status_code == 401 and self._refresh_rejected_token(token):
+            response = self._request("GET", url, headers=self._auth_headers(self.access_token), **kwargs)
+        return response
+    
+    def get_album_tracks(self, album_id: str, album_data: Optional[dict] = None) -> Optional[List[dict]]:
+        """
+        Get every track of an album, however many pages it spans
+        
+        The page offsets are known from `tracks.total`, so all pages after the
+        embedded first one are fetched in parallel instead of following the
+        `next` links one by one.
+        
+        Args:
+            album_id: The Spotify album ID
+            album_data: Album object already fetched, saves one request
+            
+        Returns:
+            list: Track objects in album order, or None if a page failed
+        """
+        cached_tracks = self._cache_get(f"{album_id}/tracks")
+        if cached_tracks is not None:
+            return cached_tracks
+        if album_data is None:
+            album_data = self._cache_get(album_id)
+        
+        if not self.ensure_access_token():
+            print("❌ No access token available. Please authenticate first.")
+            return None
         
         try:
-            response = requests.post(auth_url, headers=auth_headers, data=auth_data)
-            response.raise_for_status()
+            if album_data is None:
+                response = self._api_get(f"{self.base_url}/albums/{album_id}")
+                response.raise_for_status()
+                album_data = response.json()
+                self._cache_set(album_id, album_data)
             
-            token_data = response.json()
-            self.access_token = token_data.get("access_token")
+            tracks = list((album_data.get("tracks") or {}).get("items", []))
+            offsets = remaining_track_offsets(album_data)
+            if not offsets:
+                self._cache_set(f"{album_id}/tracks", tracks)
+                return tracks
             
-            if self.access_token:
-                print("✅ Successfully obtained access token")
-                return True
-            else:
-                print("❌ Failed to obtain access token")
-                return False
-                
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Error getting access token: {e}")
-            return False
+            def fetch_page(offset: int) -> List[dict]:
+                page = self._api_get(f"{self.base_url}/albums/{album_id}/tracks",
+                                     params={"offset": offset, "limit": MAX_TRACKS_PER_REQUEST})
+                page.raise_for_status()
+                return page.json().get("items", [])
+            
+            # One worker per pooled connection, map() keeps the pages in order
+            with ThreadPoolExecutor(max_workers=min(self.pool_size, len(offsets))) as executor:
+                for items in executor.map(fetch_page, offsets):
+                    tracks.extend(items)
+            self._cache_set(f"{album_id}/tracks", tracks)
+            return tracks
+            
+        except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
+            print(f"❌ Error fetching tracks of album {album_id}: {e}")
+            return None
     
-    def get_album_tracks_count(self, album_id: str) -> Optional[int]:
+    def get_album_tracks_count(self, album_id: str, show_tracks: bool = True) -> Optional[int]:
         """
         Get the number of tracks in a Spotify album
         
         Args:
             album_id: The Spotify album ID
+            show_tracks: Also fetch and print the full track list
             
         Returns:
             int: Number of tracks in the album, or None if error
         """
-        if not self.access_token:
+        album_data = self._cache_get(album_id)
+        if album_data is None and not self.ensure_access_token():
             print("❌ No access token available. Please authenticate first.")
             return None
         
-        headers = {
-            "Authorization": f"Bearer {self.access_token}",
-            "Content-Type": "application/json"
-        }
-        
         album_url = f"{self.base_url}/albums/{album_id}"
         
         try:
-            response = requests.get(album_url, headers=headers)
-            response.raise_for_status()
-            
-            album_data = response.json()
+            if album_data is None:
+                response = self._api_get(album_url)
+                response.raise_for_status()
+                
+                album_data = response.json()
+                self._cache_set(album_id, album_data)
             
             # Extract album information
             album_name = album_data.get("name", "Unknown Album")
             artist_names = [artist["name"] for artist in album_data.get("artists", [])]
-            tracks = album_data.get("tracks", {}).get("items", [])
-            track_count = len(tracks)
+            track_count = album_track_total(album_data)
             
             # Display results
             print(f"\n📀 Album: {album_name}")
@@ -92,6 +458,7 @@ class SpotifyAlbumTracker:
             print(f"📊 Total tracks: {track_count}")
             
             # Optional: Display track list
+            tracks = self.get_album_tracks(album_id, album_data) if show_tracks else None
             if tracks:
                 print("\n📝 Track List:")
                 for i, track in enumerate(tracks, 1):
@@ -120,7 +487,216 @@ class SpotifyAlbumTracker:
             print(f"❌ JSON Decode Error: {e}")
             return None
 
-    def main():
+    def get_albums(self, album_ids: Iterable[str]) -> Dict[str, Optional[dict]]:
+        """
+        Get the album objects of many albums, 20 albums per request
+        
+        Args:
+            album_ids: Spotify album IDs, duplicates are looked up once
+            
+        Returns:
+            dict: Album object per album ID, None for albums that were not
+            found or whose request failed
+        """
+        unique_ids = list(dict.fromkeys(album_ids))
+        results: Dict[str, Optional[dict]] = dict.fromkeys(unique_ids)
+        
+        # Only albums missing from the cache are requested
+        missing_ids = []
+        for album_id in unique_ids:
+            album_data = self._cache_get(album_id)
+            if album_data is None:
+                missing_ids.append(album_id)
+            else:
+                results[album_id] = album_data
+        
+        if missing_ids and not self.ensure_access_token():
+            print("❌ No access token available. Please authenticate first.")
+            return results
+        
+        for chunk in batched(missing_ids, MAX_ALBUMS_PER_REQUEST):
+            try:
+                response = self._api_get(f"{self.base_url}/albums", params={"ids": ",".join(chunk)})
+                response.raise_for_status()
+                albums = response.json().get("albums", [])
+            except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
+                print(f"❌ Error fetching albums {chunk[0]}..{chunk[-1]}: {e}")
+                albums = []
+            
+            results.update(self._chunk_albums(chunk, albums))
+        
+        return results
+    
+    def get_albums_track_counts(self, album_ids: Iterable[str]) -> Dict[str, Optional[int]]:
+        """
+        Get the number of tracks for many albums, 20 albums per request
+        
+        Args:
+            album_ids: Spotify album IDs, duplicates are looked up once
+            
+        Returns:
+            dict: Track count per album ID, None for albums that were not
+            found or whose request failed
+        """
+        results: Dict[str, Optional[int]] = {}
+        for chunk in batched(dict.fromkeys(album_ids), MAX_ALBUMS_PER_REQUEST):
+            for album_id, album_data in self.get_albums(chunk).items():
+                results[album_id] = album_track_total(album_data) if album_data is not None else None
+        return results
+
+def parse_album_id(value: str) -> str:
+    """Album ID from a bare ID, a `spotify:album:<id>` URI or an open.spotify.com link"""
+    value = value.strip()
+    if value.startswith("spotify:"):
+        return value.rsplit(":", 1)[-1]
+    if "://" in value:
+        return urlparse(value).path.rstrip("/").rsplit("/", 1)[-1]
+    return value
+
+def read_album_ids(lines: Iterable[str]) -> Iterator[str]:
+    """Album IDs from lines of text, skipping blank lines and # comments"""
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield parse_album_id(line)
+
+class BatchReporter:
+    """
+    Writes batch results as JSON Lines and keeps the progress counters
+    
+    Results go to `out` as soon as they arrive; progress lines and the final
+    summary go to `err`, so `out` can be piped into other tools.
+    """
+    
+    def __init__(self, out: TextIO, err: TextIO, progress_interval: float = 1.0):
+        self.out = out
+        self.err = err
+        self.progress_interval = progress_interval
+        self.albums = 0
+        self.found = 0
+        self.started = time.perf_counter()
+        self._last_progress = self.started
+    
+    def report(self, results: Dict[str, Optional[int]]):
+        for album_id, track_count in results.items():
+            self.out.write(json.dumps({"album_id": album_id, "track_count": track_count}) + "\n")
+            self.albums += 1
+            self.found += track_count is not None
+        self.out.flush()
+        now = time.perf_counter()
+        if now - self._last_progress >= self.progress_interval:
+            self._last_progress = now
+            print(f"… {self.albums} albums, {self.albums / (now - self.started):.0f} albums/s",
+                  file=self.err)
+    
+    def summary(self) -> str:
+        elapsed = time.perf_counter() - self.started
+        rate = self.albums / elapsed if elapsed else 0.0
+        return (f"✅ {self.albums} albums ({self.found} found, {self.albums - self.found} missing "
+                f"or failed) in {elapsed:.1f}s, {rate:.0f} albums/s")
+
+def run_batch(tracker: SpotifyAlbumTracker, album_ids: Iterable[str], reporter: BatchReporter,
+              workers: int = 8):
+    """
+    Count tracks for a stream of album IDs, 20 albums per request on
+    `workers` threads. At most two requests per worker are queued, so memory
+    stays flat however many IDs are read.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for chunk in batched(album_ids, MAX_ALBUMS_PER_REQUEST):
+            if len(pending) >= workers * 2:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    reporter.report(future.result())
+            pending.add(executor.submit(tracker.get_albums_track_counts, chunk))
+        for future in wait(pending).done:
+            reporter.report(future.result())
+
+def batch_main(args: argparse.Namespace) -> int:
+    """
+    Non-interactive mode: album IDs in, JSON Lines out
+    
+    Credentials come from the SPOTIFY_CLIENT_ID and SPOTIFY_CLIENT_SECRET
+    environment variables.
+    """
+    client_id = os.environ.get("SPOTIFY_CLIENT_ID")
+    client_secret = os.environ.get("SPOTIFY_CLIENT_SECRET")
+    if not client_id or not client_secret:
+        print("❌ Set SPOTIFY_CLIENT_ID and SPOTIFY_CLIENT_SECRET to use batch mode", file=sys.stderr)
+        return 2
+    
+    endpoints = {}
+    if args.base_url:
+        endpoints["base_url"] = args.base_url
+    if args.auth_url:
+        endpoints["auth_url"] = args.auth_url
+    cache = SQLiteAlbumCache(args.cache) if args.cache else None
+    rate_limiter = None
+    if args.rate_limit and args.rate_limit_file:
+        rate_limiter = FileTokenBucket(args.rate_limit_file, args.rate_limit)
+    elif args.rate_limit:
+        rate_limiter = TokenBucket(args.rate_limit)
+    
+    source = sys.stdin if args.input in (None, "-") else open(args.input, encoding="utf-8")
+    reporter = BatchReporter(sys.stdout, sys.stderr)
+    # The client reports errors with print(); keep stdout for the JSON Lines only
+    with source, contextlib.redirect_stdout(sys.stderr):
+        album_ids = read_album_ids(source)
+        if args.use_async:
+            import asyncio
+            from async_spotifyapi import AsyncSpotifyAlbumTracker, run_batch_async
+            
+            tracker = AsyncSpotifyAlbumTracker(client_id, client_secret, concurrency=args.concurrency,
+                                               cache=cache, rate_limiter=rate_limiter, **endpoints)
+            authenticated = asyncio.run(run_batch_async(tracker, album_ids, reporter))
+        else:
+            with SpotifyAlbumTracker(client_id, client_secret, pool_size=args.concurrency,
+                                     token_file=args.token_file, cache=cache,
+                                     rate_limiter=rate_limiter, **endpoints) as tracker:
+                # Fail before the first ID rather than report every album as null
+                authenticated = tracker.get_access_token()
+                if authenticated:
+                    run_batch(tracker, album_ids, reporter, workers=args.concurrency)
+    
+    if not authenticated:
+        print("❌ Could not get an access token, no albums were looked up", file=sys.stderr)
+        return 1
+    print(reporter.summary(), file=sys.stderr)
+    if cache is not None:
+        stats = cache.stats()
+        print(f"🗄️ Cache: {stats['hits']} hits, {stats['misses']} misses", file=sys.stderr)
+    if tracker.auth_failed:
+        print("❌ The token endpoint rejected the credentials during the run", file=sys.stderr)
+        return 1
+    return 0
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Count the tracks of Spotify albums. Without arguments an interactive "
+                    "menu starts; with --batch or an input file, album IDs are read one per "
+                    "line and results are written to stdout as JSON Lines."
+    )
+    parser.add_argument("input", nargs="?",
+                        help="file with one album ID, URI or link per line, - for stdin")
+    parser.add_argument("--batch", action="store_true", help="read album IDs from stdin")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="use the asyncio client (needs aiohttp)")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="threads, or requests in flight with --async")
+    parser.add_argument("--cache", help="SQLite file caching album responses between runs")
+    parser.add_argument("--token-file", help="file keeping the access token between runs")
+    parser.add_argument("--rate-limit", type=float, help="most requests per second")
+    parser.add_argument("--rate-limit-file",
+                        help="share the --rate-limit budget with other processes through this file")
+    parser.add_argument("--base-url", help="Web API root, e.g. a local mock server")
+    parser.add_argument("--auth-url", help="token endpoint, e.g. a local mock server")
+    args = parser.parse_args(argv)
+    if args.use_async and args.token_file:
+        parser.error("--token-file is not supported with --async")
+    return args
+
+def main():
     """
     Main function to demonstrate usage
     """
@@ -137,7 +713,8 @@ class SpotifyAlbumTracker:
     }
     
     # Initialize the tracker
-    tracker = SpotifyAlbumTracker(CLIENT_ID, CLIENT_SECRET)
+    # Repeat lookups of the same album, e.g. the examples, skip the network
+    tracker = SpotifyAlbumTracker(CLIENT_ID, CLIENT_SECRET, cache=MemoryAlbumCache())
     
     # Get access token
     if not tracker.get_access_token():
@@ -165,7 +742,7 @@ class SpotifyAlbumTracker:
             else:
                 print("❌ Please enter a valid album ID")
                 
-     elif choice == "2":
+        elif choice == "2":
             print("\n📀 Example Albums:")
             for i, (name, album_id) in enumerate(example_albums.items(), 1):
                 print(f"{i}. {name}")
@@ -185,6 +762,8 @@ class SpotifyAlbumTracker:
                 print("❌ Please enter a valid number")
                 
         elif choice == "3":
+            stats = tracker.cache.stats()
+            print(f"\n🗄️ Cache: {stats['hits']} hits, {stats['misses']} misses")
             print("\n👋 Goodbye!")
             break
             
@@ -192,7 +771,10 @@ class SpotifyAlbumTracker:
             print("❌ Invalid choice. Please enter 1, 2, or 3.")
 
 if __name__ == "__main__":
-    main()  
+    args = parse_args()
+    if args.batch or args.input:
+        sys.exit(batch_main(args))
+    main()
 
 
 
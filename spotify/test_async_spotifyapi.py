@@ -0,0 +1,110 @@
+import asyncio
+import os
+import threading
+
+import pytest
+
+from album_cache import MemoryAlbumCache
+from async_spotifyapi import AsyncSpotifyAlbumTracker
+from mock_spotify import album_record, start_mock_spotify
+from rate_limiter import FileTokenBucket
+
+
+@pytest.fixture
+def start_mock():
+    servers = []
+
+    def start(**options):
+        server, base_url, auth_url = start_mock_spotify(**options)
+        servers.append(server)
+        return server, base_url, auth_url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+async def collect(tracker, album_ids):
+    async with tracker:
+        return [item async for item in tracker.iter_albums_track_counts(album_ids)]
+
+
+def test_requests_in_flight_stay_within_concurrency(start_mock):
+    server, base_url, auth_url = start_mock(latency=0.05)
+    tracker = AsyncSpotifyAlbumTracker("id", "secret", base_url=base_url, auth_url=auth_url, concurrency=3)
+    album_ids = [f"album{i}-4" for i in range(200)]
+
+    results = asyncio.run(collect(tracker, album_ids))
+
+    assert dict(results) == dict.fromkeys(album_ids, 4)
+    assert server.request_count == 1 + 10
+    assert server.peak_in_flight == 3
+
+
+def test_counts_are_yielded_as_requests_finish(start_mock):
+    _, base_url, auth_url = start_mock()
+    cache = MemoryAlbumCache()
+    cache.set("cached-9", album_record(base_url, "cached-9"))
+    tracker = AsyncSpotifyAlbumTracker("id", "secret", base_url=base_url, auth_url=auth_url, cache=cache)
+    slow_ids = [f"slow{i}-2" for i in range(20)]
+    fast_ids = [f"fast{i}-3" for i in range(5)]
+
+    results = asyncio.run(collect(tracker, slow_ids + ["cached-9"] + fast_ids))
+
+    # The cached album needs no request, the fast chunk overtakes the slow one
+    assert results == [("cached-9", 9)] + [(i, 3) for i in fast_ids] + [(i, 2) for i in slow_ids]
+
+
+def test_expired_token_is_refreshed_once(start_mock):
+    server, base_url, auth_url = start_mock(token_ttl=1)
+    # A negative margin keeps using the token past its expiry, so the
+    # requests go out with it and the API answers 401
+    tracker = AsyncSpotifyAlbumTracker("id", "secret", base_url=base_url, auth_url=auth_url,
+                                       refresh_margin=-3600)
+    album_ids = [f"album{i}-5" for i in range(60)]
+
+    async def run():
+        async with tracker:
+            await tracker.get_albums_track_counts(["first-1"])
+            await asyncio.sleep(1.1)
+            return await tracker.get_albums_track_counts(album_ids)
+
+    counts = asyncio.run(run())
+
+    assert counts == dict.fromkeys(album_ids, 5)
+    # Three chunks rejected at once share a single refresh
+    assert server.tokens_issued == 2
+    assert tracker.access_token == "token-2"
+
+
+def test_file_rate_limiter_does_not_block_the_loop(start_mock, tmp_path):
+    fcntl = pytest.importorskip("fcntl")
+    _, base_url, auth_url = start_mock()
+    state_file = tmp_path / "bucket"
+    tracker = AsyncSpotifyAlbumTracker("id", "secret", base_url=base_url, auth_url=auth_url,
+                                       rate_limiter=FileTokenBucket(str(state_file), 1000))
+    # Another process holding the bucket's lock, released after 0.3s
+    fd = os.open(state_file, os.O_RDWR | os.O_CREAT)
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    threading.Timer(0.3, os.close, (fd,)).start()
+
+    async def run():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.ensure_future(tick())
+        counts = await collect(tracker, ["album-3"])
+        ticker.cancel()
+        return counts, ticks
+
+    counts, ticks = asyncio.run(run())
+
+    assert counts == [("album-3", 3)]
+    # The loop kept running while the token request waited for the lock
+    assert ticks >= 15
@@ -0,0 +1,94 @@
+import pytest
+
+from mock_spotify import start_mock_spotify
+from spotifyapi import SpotifyAlbumTracker, batch_main, parse_args
+
+
+@pytest.fixture
+def mock_api():
+    server, base_url, auth_url = start_mock_spotify()
+    yield server, base_url, auth_url
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def tracker(mock_api):
+    _, base_url, auth_url = mock_api
+    with SpotifyAlbumTracker("id", "secret", base_url=base_url, auth_url=auth_url) as tracker:
+        yield tracker
+
+
+def album_requests(server):
+    """Requests that reached the album endpoints, the token requests left out"""
+    return server.request_count - server.tokens_issued
+
+
+def test_albums_are_requested_20_at_a_time(mock_api, tracker):
+    server, _, _ = mock_api
+    album_ids = [f"album{i}-{i % 30 + 1}" for i in range(48)]
+
+    counts = tracker.get_albums_track_counts(album_ids)
+
+    assert counts == {album_id: int(album_id.rsplit("-", 1)[1]) for album_id in album_ids}
+    assert album_requests(server) == 3
+
+
+def test_duplicate_ids_are_looked_up_once(mock_api, tracker):
+    server, _, _ = mock_api
+    album_ids = [f"album{i}-5" for i in range(20)]
+
+    counts = tracker.get_albums_track_counts(album_ids + album_ids[::-1])
+
+    assert list(counts) == album_ids
+    assert album_requests(server) == 1
+
+
+def test_unknown_albums_map_to_none(tracker):
+    counts = tracker.get_albums_track_counts(["known-7", "missing-1", "other-3"])
+
+    assert counts == {"known-7": 7, "missing-1": None, "other-3": 3}
+
+
+def test_failed_chunk_maps_to_none_only_for_its_albums(mock_api, tracker):
+    server, _, _ = mock_api
+    good_before = [f"before{i}-2" for i in range(20)]
+    failing = [f"fail{i}-4" for i in range(19)] + ["invalid-id"]
+    good_after = [f"after{i}-6" for i in range(8)]
+
+    counts = tracker.get_albums_track_counts(good_before + failing + good_after)
+
+    assert all(counts[album_id] == 2 for album_id in good_before)
+    assert all(counts[album_id] is None for album_id in failing)
+    assert all(counts[album_id] == 6 for album_id in good_after)
+    assert album_requests(server) == 3
+
+
+@pytest.mark.parametrize("mode", [[], ["--async"]])
+def test_batch_stops_when_the_credentials_are_rejected(mock_api, tmp_path, monkeypatch, capsys, mode):
+    server, base_url, auth_url = mock_api
+    monkeypatch.setenv("SPOTIFY_CLIENT_ID", "id")
+    monkeypatch.setenv("SPOTIFY_CLIENT_SECRET", "secret")
+    ids_file = tmp_path / "album_ids.txt"
+    ids_file.write_text("".join(f"album{i}-3\n" for i in range(200)))
+
+    args = parse_args([str(ids_file), *mode, "--base-url", base_url, "--auth-url", auth_url + "/wrong"])
+
+    assert batch_main(args) == 1
+    assert capsys.readouterr().out == ""
+    assert server.request_count == 1
+
+
+def test_throttled_token_request_is_not_a_rejection():
+    server, base_url, auth_url = start_mock_spotify(rate_limit=1, retry_after=0)
+    try:
+        with SpotifyAlbumTracker("id", "secret", base_url=base_url, auth_url=auth_url,
+                                 max_retries=0) as tracker:
+            server.window_count = server.rate_limit  # the next request is over the limit
+            assert not tracker.get_access_token()
+            assert not tracker.auth_failed
+            server.window_count = 0
+            assert tracker.get_access_token()
+    finally:
+        server.shutdown()
+        server.server_close()